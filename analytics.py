@@ -0,0 +1,129 @@
+# analytics.py
+import heapq
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Tuple
+from config import Config
+
+class SpaceSaving:
+    """
+    Approximate top-k counter in bounded memory (Space-Saving algorithm)
+
+    At most capacity keys are tracked. A new key arriving when full replaces
+    the key with the smallest count and inherits that count, recorded as its
+    possible overcount, so every key with a true frequency above
+    total / capacity is guaranteed to be tracked.
+
+    The smallest count is found with a min-heap holding one entry per key.
+    Increments leave heap entries stale (too low); an eviction re-pushes
+    stale entries until the top is exact, so offers cost O(log capacity)
+    amortized instead of a scan of every counter.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total = 0
+        # key -> [count, maximum overcount]
+        self._counters: Dict[Hashable, List[int]] = {}
+        # (count when pushed, insertion order, key); counts only grow, so
+        # every entry is a lower bound of its key's count
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._pushed = 0
+
+    def _push(self, count: int, key: Hashable):
+        self._pushed += 1
+        heapq.heappush(self._heap, (count, self._pushed, key))
+
+    def offer(self, key: Hashable, count: int = 1):
+        """Count occurrences of a key"""
+        self.total += count
+        counter = self._counters.get(key)
+        if counter is not None:
+            counter[0] += count
+            return
+        if len(self._counters) < self.capacity:
+            self._counters[key] = [count, 0]
+            self._push(count, key)
+            return
+
+        while True:
+            stale, _, victim = heapq.heappop(self._heap)
+            current = self._counters[victim][0]
+            if current == stale:
+                break
+            self._push(current, victim)
+        del self._counters[victim]
+        self._counters[key] = [stale + count, stale]
+        self._push(stale + count, key)
+
+    def counts(self) -> Dict[Hashable, Tuple[int, int]]:
+        """Tracked keys with (estimated count, maximum overcount)"""
+        return {key: (counter[0], counter[1]) for key, counter in self._counters.items()}
+
+class SearchAnalytics:
+    """
+    Process-wide heavy hitters of city searches over a sliding window
+
+    Searches are counted per resolved location, so every spelling of a city
+    adds to one count, into time buckets of Config.ANALYTICS_BUCKET_SECONDS,
+    each summarized by a bounded SpaceSaving counter; the window keeps the
+    last Config.ANALYTICS_WINDOW_BUCKETS of them. Recording costs a dict
+    update, plus a heap operation when a new city displaces another.
+    """
+
+    def __init__(self, bucket_seconds: float = None, window_buckets: int = None, capacity: int = None):
+        self.bucket_seconds = bucket_seconds or Config.ANALYTICS_BUCKET_SECONDS
+        self.window_buckets = window_buckets or Config.ANALYTICS_WINDOW_BUCKETS
+        self.capacity = capacity or Config.ANALYTICS_CAPACITY
+        # (bucket index, counter), oldest first
+        self._buckets: Deque[Tuple[int, SpaceSaving]] = deque()
+        self._lock = threading.Lock()
+
+    def _current(self, now: float) -> SpaceSaving:
+        index = int(now // self.bucket_seconds)
+        if not self._buckets or self._buckets[-1][0] != index:
+            self._buckets.append((index, SpaceSaving(self.capacity)))
+        while self._buckets[0][0] <= index - self.window_buckets:
+            self._buckets.popleft()
+        return self._buckets[-1][1]
+
+    def record(self, location_id: int, name: str):
+        """Count one search that resolved to a location (name is its display name)"""
+        with self._lock:
+            self._current(time.time()).offer((location_id, name))
+
+    def hot_cities(self, limit: int = 10, window: float = None) -> List[Tuple[int, str, int]]:
+        """
+        Most searched cities, most frequent first
+
+        Args:
+            limit (int): Number of cities to return
+            window (float): Only count the most recent seconds (whole
+                buckets); defaults to the full window
+
+        Returns:
+            List of (location id, display name, estimated count)
+        """
+        now = time.time()
+        first = int((now - window) // self.bucket_seconds) + 1 if window else None
+        totals: Dict[Tuple[int, str], int] = {}
+        with self._lock:
+            self._current(now)
+            for index, counter in self._buckets:
+                if first is not None and index < first:
+                    continue
+                for key, (count, _) in counter.counts().items():
+                    totals[key] = totals.get(key, 0) + count
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(location_id, name, count) for (location_id, name), count in ranked]
+
+    def stats(self) -> Dict[str, int]:
+        """Searches counted and cities tracked in the window"""
+        with self._lock:
+            self._current(time.time())
+            return {
+                'searches': sum(counter.total for _, counter in self._buckets),
+                'tracked': len({key for _, counter in self._buckets for key in counter.counts()}),
+                'buckets': len(self._buckets)
+            }
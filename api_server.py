@@ -0,0 +1,263 @@
+# api_server.py
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, Optional
+from aiohttp import web
+from config import Config
+from weather_app_API import WeatherAPI, WeatherAPIError
+from scheduler import run_with_priority
+
+logger = logging.getLogger(__name__)
+
+API_KEY = web.AppKey("api", WeatherAPI)
+EXECUTOR_KEY = web.AppKey("executor", ThreadPoolExecutor)
+BATCH_EXECUTOR_KEY = web.AppKey("batch_executor", ThreadPoolExecutor)
+
+# Upstream error statuses with a client-facing equivalent; others are a bad gateway
+PASSTHROUGH_STATUSES = {404: 404, 429: 503}
+
+class BadRequest(ValueError):
+    """Invalid query parameters or request body"""
+    pass
+
+def create_app(api: Optional[WeatherAPI] = None) -> web.Application:
+    """
+    Build the HTTP service around one shared WeatherAPI client
+
+    Every request goes through the same client, so all callers share its
+    cache, in-flight request coalescing and upstream connection pool.
+    Blocking client calls run on a thread pool off the event loop; batch
+    requests get their own small pool, so a waiting batch never holds the
+    threads single-city requests run on.
+    """
+    app = web.Application(middlewares=[error_middleware, compression_middleware])
+    app[API_KEY] = api or WeatherAPI()
+    app[EXECUTOR_KEY] = ThreadPoolExecutor(max_workers=Config.API_SERVER_WORKERS,
+                                           thread_name_prefix="weather-http")
+    app[BATCH_EXECUTOR_KEY] = ThreadPoolExecutor(max_workers=Config.API_BATCH_WORKERS,
+                                                 thread_name_prefix="weather-http-batch")
+    app.router.add_get("/v1/weather", weather_handler)
+    app.router.add_get("/v1/forecast", forecast_handler)
+    app.router.add_get("/v1/batch", batch_handler)
+    app.router.add_post("/v1/batch", batch_handler)
+    app.router.add_get("/v1/search", search_handler)
+    app.router.add_get("/v1/aqi", aqi_handler)
+    app.router.add_get("/v1/hot-cities", hot_cities_handler)
+    app.router.add_get("/health", health_handler)
+    app.on_cleanup.append(_shutdown)
+    return app
+
+async def _shutdown(app: web.Application):
+    """Stop the worker threads when the service exits"""
+    app[EXECUTOR_KEY].shutdown(wait=False)
+    app[BATCH_EXECUTOR_KEY].shutdown(wait=False)
+
+async def _call(request: web.Request, fn: Callable, *args, priority: str = "interactive") -> Any:
+    """Run a blocking client call on the service's thread pool for its priority"""
+    loop = asyncio.get_running_loop()
+    executor = request.app[EXECUTOR_KEY if priority == "interactive" else BATCH_EXECUTOR_KEY]
+    return await loop.run_in_executor(executor, partial(run_with_priority, priority, fn, *args))
+
+# Request parsing
+
+def _required(request: web.Request, name: str) -> str:
+    value = request.query.get(name, "").strip()
+    if not value:
+        raise BadRequest(f"Missing required parameter '{name}'")
+    return value
+
+def _units(request: web.Request) -> str:
+    units = request.query.get("units", Config.DEFAULT_UNITS)
+    if units not in Config.UNITS_DISPLAY:
+        raise BadRequest(f"Unknown units '{units}'; expected one of {', '.join(Config.UNITS_DISPLAY)}")
+    return units
+
+def _number(request: web.Request, name: str, cast: Callable, low: float, high: float,
+            default: Any = None) -> Any:
+    raw = request.query.get(name)
+    if raw is None and default is not None:
+        return default
+    try:
+        value = cast(raw)
+    except (TypeError, ValueError):
+        raise BadRequest(f"Parameter '{name}' must be a number")
+    if not low <= value <= high:
+        raise BadRequest(f"Parameter '{name}' must be between {low} and {high}")
+    return value
+
+# Responses
+
+def _age(payload: Any) -> Optional[float]:
+    """Seconds since a payload was fetched upstream, if it records that"""
+    if isinstance(payload, dict):
+        fetch_time = payload.get('_metadata', {}).get('fetch_time')
+        if fetch_time is not None:
+            return max(0.0, time.time() - fetch_time)
+    return None
+
+def _etag_matches(request: web.Request, etag: str) -> bool:
+    """Whether If-None-Match names the current representation"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    # Weak comparison: compression may have been applied to the cached copy
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+def cached_json(request: web.Request, payload: Any, ttl: float, age: Optional[float]) -> web.Response:
+    """
+    JSON response with validators and freshness derived from the cache entry
+
+    The ETag is a digest of the body, so clients revalidating an unchanged
+    entry get a bodiless 304. max-age is what remains of the entry's TTL,
+    so downstream caches never hold data longer than this service would.
+    """
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    remaining = max(0, int(ttl - (age or 0)))
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={remaining}",
+        "Vary": "Accept-Encoding",
+    }
+    if age is not None:
+        headers["Age"] = str(int(age))
+
+    if _etag_matches(request, etag):
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type="application/json", headers=headers)
+
+def error_json(status: int, message: str) -> web.Response:
+    """JSON error body that intermediaries must not cache"""
+    return web.json_response({'error': message}, status=status,
+                             headers={"Cache-Control": "no-store"})
+
+@web.middleware
+async def error_middleware(request: web.Request, handler) -> web.StreamResponse:
+    """Map client and upstream errors to HTTP statuses"""
+    try:
+        return await handler(request)
+    except BadRequest as e:
+        return error_json(400, str(e))
+    except WeatherAPIError as e:
+        return error_json(PASSTHROUGH_STATUSES.get(e.status_code, 502), str(e))
+
+@web.middleware
+async def compression_middleware(request: web.Request, handler) -> web.StreamResponse:
+    """gzip responses large enough to benefit when the client accepts it"""
+    response = await handler(request)
+    if (isinstance(response, web.Response) and response.body is not None
+            and len(response.body) >= Config.API_GZIP_MIN_BYTES
+            and "gzip" in request.headers.get("Accept-Encoding", "")):
+        response.enable_compression(web.ContentCoding.gzip)
+    return response
+
+# Endpoints
+
+async def weather_handler(request: web.Request) -> web.Response:
+    """GET /v1/weather?city=London&units=metric"""
+    api = request.app[API_KEY]
+    data = await _call(request, api.get_weather, _required(request, "city"), _units(request), False)
+    return cached_json(request, data, Config.CACHE_DURATION, _age(data))
+
+async def forecast_handler(request: web.Request) -> web.Response:
+    """GET /v1/forecast?city=London&days=5&units=metric"""
+    api = request.app[API_KEY]
+    city = _required(request, "city")
+    days = _number(request, "days", int, 1, 5, default=5)
+    data = await _call(request, api.get_forecast, city, days, _units(request))
+    return cached_json(request, data, Config.CACHE_DURATION, _age(data))
+
+async def batch_handler(request: web.Request) -> web.Response:
+    """GET /v1/batch?cities=London,Paris or POST {"cities": [...], "units": "metric"}"""
+    if request.method == "POST":
+        try:
+            body = await request.json()
+        except ValueError:
+            raise BadRequest("Request body must be JSON")
+        if not isinstance(body, dict):
+            raise BadRequest("Request body must be a JSON object")
+        cities = body.get("cities")
+        units = body.get("units", Config.DEFAULT_UNITS)
+        if not isinstance(cities, list) or not all(isinstance(city, str) for city in cities):
+            raise BadRequest("'cities' must be a list of city names")
+        if units not in Config.UNITS_DISPLAY:
+            raise BadRequest(f"Unknown units '{units}'")
+    else:
+        cities = _required(request, "cities").split(",")
+        units = _units(request)
+
+    cities = list(dict.fromkeys(city.strip() for city in cities if city.strip()))
+    if not cities:
+        raise BadRequest("No cities given")
+    if len(cities) > Config.API_MAX_BATCH_CITIES:
+        raise BadRequest(f"At most {Config.API_MAX_BATCH_CITIES} cities per batch")
+
+    api = request.app[API_KEY]
+    # One client call fetches the whole batch on its batch-class pool
+    result = await _call(request, api.get_multiple_cities_weather, cities, units, "batch", False,
+                         priority="batch")
+    if result['errors']:
+        # Partial results: let the caller retry the failures without caching them
+        return web.json_response(result, headers={"Cache-Control": "no-store"})
+    # Fresh only as long as the oldest entry in the batch
+    ages: List[float] = [age for age in map(_age, result['successful'].values()) if age is not None]
+    return cached_json(request, result, Config.CACHE_DURATION, max(ages) if ages else None)
+
+async def search_handler(request: web.Request) -> web.Response:
+    """GET /v1/search?q=Lon&limit=5"""
+    api = request.app[API_KEY]
+    query = _required(request, "q")
+    limit = _number(request, "limit", int, 1, 5, default=5)
+    data = await _call(request, api.search_cities, query, limit)
+    # Geocoding results carry no fetch time; the short weather TTL keeps
+    # downstream copies well inside the geocoding cache's lifetime
+    return cached_json(request, data, Config.CACHE_DURATION, None)
+
+async def aqi_handler(request: web.Request) -> web.Response:
+    """GET /v1/aqi?lat=51.5&lon=-0.12"""
+    api = request.app[API_KEY]
+    lat = _number(request, "lat", float, -90, 90)
+    lon = _number(request, "lon", float, -180, 180)
+    data = await _call(request, api.get_air_quality, lat, lon)
+    return cached_json(request, data, Config.AQI_CACHE_DURATION, _age(data))
+
+async def hot_cities_handler(request: web.Request) -> web.Response:
+    """GET /v1/hot-cities?limit=10&window=3600: most searched cities across all callers"""
+    api = request.app[API_KEY]
+    limit = _number(request, "limit", int, 1, Config.ANALYTICS_CAPACITY, default=10)
+    window = _number(request, "window", float, 1, Config.ANALYTICS_BUCKET_SECONDS * Config.ANALYTICS_WINDOW_BUCKETS,
+                     default=Config.ANALYTICS_BUCKET_SECONDS * Config.ANALYTICS_WINDOW_BUCKETS)
+    cities = api.analytics.hot_cities(limit, window)
+    return web.json_response({'cities': [{'id': location_id, 'city': label, 'count': count}
+                                         for location_id, label, count in cities]},
+                             headers={"Cache-Control": "no-store"})
+
+def _health(api: WeatherAPI) -> dict:
+    """Cache and upstream statistics (sizing a shared cache can take a while)"""
+    return {
+        'status': 'ok',
+        'cache': api.cache_stats(),
+        'upstream_latency': api.latency.stats(),
+        'retry_budget': api.retry_budget.stats(),
+        'scheduler': api.scheduler.stats(),
+        'search_analytics': api.analytics.stats()
+    }
+
+async def health_handler(request: web.Request) -> web.Response:
+    """GET /health: liveness plus cache and upstream statistics, gathered off the event loop"""
+    data = await _call(request, _health, request.app[API_KEY])
+    return web.json_response(data, headers={"Cache-Control": "no-store"})
+
+def main():
+    """Run the service on Config.API_SERVER_HOST:API_SERVER_PORT"""
+    logger.info(f"Starting weather API service on {Config.API_SERVER_HOST}:{Config.API_SERVER_PORT}")
+    web.run_app(create_app(), host=Config.API_SERVER_HOST, port=Config.API_SERVER_PORT)
+
+if __name__ == "__main__":
+    main()
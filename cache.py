@@ -0,0 +1,615 @@
+# cache.py
+import atexit
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from config import Config
+import codec
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a time-to-live"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.time() - entry[1] >= self.ttl:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, fetch_time: float = None):
+        """Store a value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._data[key] = (value, fetch_time if fetch_time is not None else time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0
+            }
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for key unless a call for key is already in flight"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+class SharedPayloadStore:
+    """
+    Read-only payloads shared by every UI session
+
+    Sessions keep only the reference returned by put(), and sessions
+    showing the same data share one object, so memory grows with the
+    number of distinct payloads rather than the number of sessions.
+    Entries expire once no session has read them for the TTL, which
+    reclaims the data of idle or closed sessions without tracking them.
+    Stored payloads must not be modified.
+    """
+
+    def __init__(self, maxsize: int = None, ttl: float = None):
+        self._entries = TTLCache(
+            maxsize=maxsize or Config.SESSION_STORE_MAX_ENTRIES,
+            ttl=ttl or Config.SESSION_STORE_TTL
+        )
+        self._lock = threading.Lock()
+
+    def put(self, kind: str, version: str, payload: Any) -> str:
+        """Store a payload (or reuse the identical one already held) and return its reference"""
+        ref = f"{kind}:{version}"
+        with self._lock:
+            existing = self._entries.get(ref)
+            self._entries.set(ref, existing if existing is not None else payload)
+        return ref
+
+    def get(self, ref: Optional[str]) -> Optional[Any]:
+        """Resolve a reference, renewing its expiry; None once it has expired"""
+        if not ref:
+            return None
+        with self._lock:
+            payload = self._entries.get(ref)
+            if payload is not None:
+                self._entries.set(ref, payload)
+            return payload
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters"""
+        return self._entries.stats()
+
+def snap_to_grid(lat: float, lon: float, grid: float) -> Tuple[float, float]:
+    """Snap coordinates to the center of their grid cell"""
+    return (
+        round((lat // grid) * grid + grid / 2, 6),
+        round((lon // grid) * grid + grid / 2, 6)
+    )
+
+def cache_key(*parts: Any) -> str:
+    """Build a backend key from parts, normalizing case and whitespace"""
+    return ':'.join(str(part).strip().lower() for part in parts)
+
+def dataset_version(data: Dict[str, Any]) -> str:
+    """Identify a fetched payload so unchanged data maps to the same figures and summaries"""
+    metadata = data.get('_metadata', {})
+    location_id = data.get('id') or data.get('city', {}).get('id')
+    # The body fingerprint survives refetches of identical data; fall back
+    # to the fetch time for payloads recorded without one
+    version = f"{location_id}:{metadata.get('fingerprint') or metadata.get('fetch_time')}"
+    if 'list' in data:
+        # Forecast slices of one fetch share its fingerprint
+        version += f":{len(data['list'])}"
+    return version
+
+class CacheBackend:
+    """
+    Key/value store for cached API responses
+
+    Values are JSON-serializable payloads with a per-entry TTL, stored in
+    the compact binary form from codec.py and decoded only when read, so
+    every read returns a fresh copy. Backends never raise on lookup
+    failures; an unreachable store behaves as a miss so caching can only
+    save upstream calls, not fail requests. Writes, deletes and sizing
+    likewise log and carry on when the store is unreachable.
+    """
+
+    name = "base"
+    # Entries survive a restart without snapshots
+    persistent = False
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store a value for ttl seconds"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Remove an entry if present"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all entries"""
+        raise NotImplementedError
+
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        """Number of stored entries, including expired ones not yet purged (None if unknown)"""
+        raise NotImplementedError
+
+    def memory_bytes(self) -> Optional[int]:
+        """Encoded bytes held in this process, if the backend keeps entries locally"""
+        return None
+
+    def snapshot(self, path: str) -> int:
+        """Write live entries to path; persistent backends have nothing to save"""
+        return 0
+
+    def load_snapshot(self, path: str) -> int:
+        """Load entries saved by snapshot(); returns the number restored"""
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend name, size, memory use and hit/miss counters"""
+        with self._stats_lock:
+            total = self.hits + self.misses
+            stats = {
+                'backend': self.name,
+                'codec': codec.codec_name(),
+                'bytes': self.memory_bytes(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0
+            }
+        try:
+            stats['size'] = self.size()
+        except Exception as e:
+            logger.warning(f"Could not size {self.name} cache: {e}")
+            stats['size'] = None
+        return stats
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process LRU backend; entries are local to one replica
+
+    Entries are held encoded and evicted least recently used first once
+    either maxsize entries or max_bytes of encoded data are exceeded.
+    """
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = None, max_bytes: int = None):
+        super().__init__()
+        self.maxsize = maxsize or Config.CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or Config.CACHE_MAX_BYTES
+        # key -> (encoded value, expires_at), least recently used first
+        self._data: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if time.time() >= entry[1]:
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+        # Decode outside the lock
+        return codec.decode(entry[0])
+
+    def set(self, key: str, value: Any, ttl: float):
+        try:
+            encoded = codec.encode(value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not encode cache entry {key}: {e}")
+            return
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (encoded, time.time() + ttl)
+            self._bytes += len(encoded)
+            while len(self._data) > self.maxsize or (self._bytes > self.max_bytes and len(self._data) > 1):
+                self._pop(next(iter(self._data)))
+
+    def _pop(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def delete(self, key: str):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def size(self) -> int:
+        return len(self._data)
+
+    def memory_bytes(self) -> Optional[int]:
+        return self._bytes
+
+    def snapshot(self, path: str) -> int:
+        """
+        Write live entries to path, least recently used first
+
+        Entries are written still encoded with their absolute expiry time,
+        to a temporary file that then replaces path atomically.
+        """
+        now = time.time()
+        with self._lock:
+            entries = [(key, value, expires_at) for key, (value, expires_at) in self._data.items()
+                       if expires_at > now]
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            for key, value, expires_at in entries:
+                encoded_key = key.encode('utf-8')
+                f.write(SNAPSHOT_ENTRY.pack(expires_at, len(encoded_key), len(value)))
+                f.write(encoded_key)
+                f.write(value)
+        os.replace(tmp_path, path)
+        return len(entries)
+
+    def load_snapshot(self, path: str) -> int:
+        """
+        Restore unexpired entries from a snapshot file
+
+        The whole file is parsed before anything is restored, so a corrupt
+        or truncated snapshot raises ValueError and leaves the cache as it was.
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(SNAPSHOT_MAGIC):
+            raise ValueError(f"{path} is not a cache snapshot")
+
+        view = memoryview(data)
+        offset = len(SNAPSHOT_MAGIC)
+        entries = []
+        while offset < len(data):
+            if offset + SNAPSHOT_ENTRY.size > len(data):
+                raise ValueError(f"{path} is truncated")
+            expires_at, key_len, value_len = SNAPSHOT_ENTRY.unpack_from(data, offset)
+            offset += SNAPSHOT_ENTRY.size
+            if offset + key_len + value_len > len(data):
+                raise ValueError(f"{path} is truncated")
+            key = bytes(view[offset:offset + key_len]).decode('utf-8')
+            entries.append((key, bytes(view[offset + key_len:offset + key_len + value_len]), expires_at))
+            offset += key_len + value_len
+
+        now = time.time()
+        restored = 0
+        with self._lock:
+            for key, value, expires_at in entries:
+                # Entries keep their original expiry, so TTLs stay honest
+                if expires_at <= now or key in self._data:
+                    continue
+                self._data[key] = (value, expires_at)
+                self._bytes += len(value)
+                restored += 1
+            while len(self._data) > self.maxsize or (self._bytes > self.max_bytes and len(self._data) > 1):
+                self._pop(next(iter(self._data)))
+        return restored
+
+# Snapshot file layout: magic, then per entry (expires_at, key length,
+# value length) followed by the key and the encoded value
+SNAPSHOT_MAGIC = b'WXCACHE1'
+SNAPSHOT_ENTRY = struct.Struct('<dII')
+
+class CacheSnapshotter:
+    """
+    Periodically snapshot a cache backend to disk for warm restarts
+
+    Restores the last snapshot when started, saves every interval seconds
+    on a background thread and once more at interpreter shutdown.
+    """
+
+    def __init__(self, backend: CacheBackend, path: str = None, interval: float = None):
+        self.backend = backend
+        self.path = path or Config.CACHE_SNAPSHOT_PATH
+        self.interval = interval or Config.CACHE_SNAPSHOT_INTERVAL
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> int:
+        """Load the previous snapshot and begin periodic saves"""
+        restored = 0
+        if os.path.exists(self.path):
+            try:
+                start = time.time()
+                restored = self.backend.load_snapshot(self.path)
+                logger.info(f"Warm-started {restored} cache entries from {self.path} in {time.time() - start:.2f}s")
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(f"Could not load cache snapshot {self.path}: {e}")
+
+        self._thread = threading.Thread(target=self._loop, name="cache-snapshot", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        return restored
+
+    def save(self) -> int:
+        """Write a snapshot now"""
+        try:
+            saved = self.backend.snapshot(self.path)
+            logger.info(f"Saved {saved} cache entries to {self.path}")
+            return saved
+        except OSError as e:
+            logger.warning(f"Could not save cache snapshot {self.path}: {e}")
+            return 0
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.save()
+
+    def stop(self):
+        """Stop periodic saves and write a final snapshot"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.save()
+
+class SQLiteBackend(CacheBackend):
+    """
+    SQLite file backend
+
+    Shared by every process on a host (replicas on one machine or a shared
+    volume). Expired rows are purged on write, and the least recently
+    written rows are dropped beyond maxsize.
+    """
+
+    name = "sqlite"
+    persistent = True
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires_at REAL NOT NULL,
+        written_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at);
+    CREATE INDEX IF NOT EXISTS idx_cache_written ON cache (written_at);
+    """
+
+    def __init__(self, db_path: str = None, maxsize: int = None):
+        super().__init__()
+        self.db_path = db_path or Config.CACHE_DB_PATH
+        self.maxsize = maxsize or Config.CACHE_MAX_ENTRIES
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+            return codec.decode(row[0]) if row else None
+        except Exception as e:
+            logger.warning(f"SQLite cache read failed for {key}: {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at, written_at) VALUES (?, ?, ?, ?)",
+                    (key, codec.encode(value), now + ttl, now)
+                )
+                self._writes += 1
+                # Purge periodically rather than on every write
+                if self._writes % 100 == 0:
+                    conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                    conn.execute(
+                        "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                        "ORDER BY written_at DESC LIMIT -1 OFFSET ?)", (self.maxsize,)
+                    )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"SQLite cache write failed for {key}: {e}")
+
+    def delete(self, key: str):
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache delete failed for {key}: {e}")
+
+    def clear(self):
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM cache")
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache clear failed: {e}")
+
+    def size(self) -> Optional[int]:
+        try:
+            return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Could not size SQLite cache: {e}")
+            return None
+
+class RedisBackend(CacheBackend):
+    """
+    Redis-protocol backend shared by every replica
+
+    Works with Redis or any server speaking its protocol (Valkey, KeyDB,
+    a local redis-server for testing). Expiry is delegated to the server.
+    A client object with get/set/delete/scan_iter can be injected instead
+    of a URL.
+    """
+
+    name = "redis"
+    persistent = True
+
+    def __init__(self, url: str = None, client: Any = None, prefix: str = None):
+        super().__init__()
+        self.prefix = prefix or Config.CACHE_KEY_PREFIX
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("redis is required for the Redis cache backend. Install it with 'pip install redis'.")
+            client = redis.Redis.from_url(
+                url or Config.REDIS_URL,
+                socket_timeout=Config.REDIS_TIMEOUT,
+                socket_connect_timeout=Config.REDIS_TIMEOUT
+            )
+        self.client = client
+
+    def _get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(self.prefix + key)
+            return codec.decode(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning(f"Redis cache read failed for {key}: {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: float):
+        try:
+            self.client.set(
+                self.prefix + key,
+                codec.encode(value),
+                ex=max(1, int(ttl))
+            )
+        except Exception as e:
+            logger.warning(f"Redis cache write failed for {key}: {e}")
+
+    def delete(self, key: str):
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed for {key}: {e}")
+
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + '*'))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Redis cache clear failed: {e}")
+
+    def size(self) -> Optional[int]:
+        try:
+            return sum(1 for _ in self.client.scan_iter(match=self.prefix + '*'))
+        except Exception as e:
+            logger.warning(f"Could not size Redis cache: {e}")
+            return None
+
+CACHE_BACKENDS = {
+    'memory': MemoryBackend,
+    'sqlite': SQLiteBackend,
+    'redis': RedisBackend,
+}
+
+def create_cache_backend(kind: str = None) -> CacheBackend:
+    """
+    Create the response cache backend named by Config.CACHE_BACKEND
+
+    Falls back to the in-memory backend if the configured one cannot be
+    created, so a missing Redis server degrades to per-replica caching.
+    """
+    kind = (kind or Config.CACHE_BACKEND).lower()
+    if kind not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown cache backend: {kind}. Choose from {', '.join(CACHE_BACKENDS)}")
+
+    try:
+        backend = CACHE_BACKENDS[kind]()
+        if kind == 'redis':
+            backend.client.ping()
+        logger.info(f"Using {kind} cache backend")
+        return backend
+    except Exception as e:
+        logger.warning(f"{kind} cache backend unavailable ({e}); using in-memory cache")
+        return MemoryBackend()
@@ -0,0 +1,239 @@
+# charts.py
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Tuple
+import numpy as np
+from config import Config
+from cache import dataset_version
+
+# plotly is imported when the first figure is built, not at app startup
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
+
+logger = logging.getLogger(__name__)
+
+# Layout shared by every chart; per-figure settings are merged on top
+BASE_LAYOUT = dict(
+    template='plotly_white',
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(family='Inter', size=12),
+    showlegend=False
+)
+
+TITLE_FONT = dict(size=18, color='#2c3e50', family='Inter')
+
+# Grouped series of the many-city comparison: frame column -> (label, color)
+MATRIX_TEMPERATURE_SERIES = {
+    'temperature': ("Temperature", '#0984e3'),
+    'feels_like': ("Feels Like", '#74b9ff'),
+    'temp_min': ("Min", '#81ecec'),
+    'temp_max': ("Max", '#e17055'),
+}
+MATRIX_CONDITION_SERIES = {
+    'humidity': ("Humidity", '#00b894'),
+    'clouds': ("Cloud Cover", '#b2bec3'),
+}
+
+_figure_cache: "OrderedDict[Hashable, go.Figure]" = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+def _memoize(key: Hashable, build: Callable[[], "go.Figure"]) -> "go.Figure":
+    """Return the cached figure for key, building it on a miss"""
+    with _cache_lock:
+        figure = _figure_cache.get(key)
+        if figure is not None:
+            _figure_cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            return figure
+        _cache_stats['misses'] += 1
+
+    figure = build()
+
+    with _cache_lock:
+        _figure_cache[key] = figure
+        while len(_figure_cache) > Config.FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    return figure
+
+def figure_cache_stats() -> Dict[str, int]:
+    """Return hit/miss counters and the current number of cached figures"""
+    with _cache_lock:
+        return dict(_cache_stats, size=len(_figure_cache))
+
+def _layout(title: str, **overrides) -> Dict[str, Any]:
+    """Build a layout dict from the shared base"""
+    layout = dict(BASE_LAYOUT, title=dict(text=title, x=0.5, font=TITLE_FONT))
+    layout.update(overrides)
+    return layout
+
+def forecast_figure(forecast_data: Dict[str, Any], units: str) -> "go.Figure":
+    """Temperature trend figure for a forecast payload"""
+    key = ('forecast', dataset_version(forecast_data), units)
+
+    def build() -> "go.Figure":
+        import plotly.graph_objects as go
+        forecast_list = forecast_data['list']
+        city_name = forecast_data['city']['name']
+        times = np.array([datetime.fromtimestamp(item['dt']) for item in forecast_list], dtype='datetime64[s]')
+        temps = np.fromiter((item['main']['temp'] for item in forecast_list), dtype=np.float32, count=len(forecast_list))
+
+        return go.Figure(
+            data=[go.Scatter(
+                x=times,
+                y=temps,
+                mode='lines+markers',
+                name='Temperature',
+                line=dict(color='#74b9ff', width=3),
+                marker=dict(size=8, color='#0984e3'),
+                fill='tonexty',
+                fillcolor='rgba(116, 185, 255, 0.1)'
+            )],
+            layout=_layout(
+                f"🌡️ Temperature Trend - {city_name}",
+                xaxis_title="Time",
+                yaxis_title=f"Temperature ({Config.UNITS_DISPLAY[units]['temp']})",
+                hovermode='x unified'
+            )
+        )
+
+    return _memoize(key, build)
+
+def comparison_figure(weather_list: List[Dict[str, Any]], units: str) -> "go.Figure":
+    """Temperature bar chart comparing current weather payloads"""
+    key = ('comparison', tuple(dataset_version(data) for data in weather_list), units)
+
+    def build() -> "go.Figure":
+        import plotly.graph_objects as go
+        names = [data['name'] for data in weather_list]
+        temps = np.fromiter((data['main']['temp'] for data in weather_list), dtype=np.float32, count=len(weather_list))
+
+        return go.Figure(
+            data=[go.Bar(
+                x=names,
+                y=temps,
+                marker=dict(color=temps, colorscale='RdYlBu_r')
+            )],
+            layout=_layout(
+                f"🌡️ Temperature Comparison ({Config.UNITS_DISPLAY[units]['temp']})",
+                xaxis_title="City",
+                yaxis_title="Temperature"
+            )
+        )
+
+    return _memoize(key, build)
+
+def comparison_matrix_figure(frame: "pd.DataFrame", series: Dict[str, Tuple[str, str]], title: str,
+                             yaxis_title: str, version: Hashable) -> "go.Figure":
+    """
+    Grouped bar chart of several metrics across many cities
+
+    Built straight from the columns of one comparison frame (one row per
+    city), so the cost is a handful of traces however many cities there
+    are. version identifies the frame's data, units and row order.
+    """
+    key = ('matrix', version, title, tuple(series))
+
+    def build() -> "go.Figure":
+        import plotly.graph_objects as go
+
+        names = frame['name'].to_numpy(dtype=object, na_value='')
+        return go.Figure(
+            data=[
+                go.Bar(
+                    name=label,
+                    x=names,
+                    y=frame[column].to_numpy(dtype=np.float32, na_value=np.nan),
+                    marker_color=color
+                )
+                for column, (label, color) in series.items()
+            ],
+            layout=_layout(
+                title,
+                barmode='group',
+                xaxis=dict(title="City", tickangle=-45),
+                yaxis_title=yaxis_title,
+                showlegend=True,
+                legend=dict(orientation='h', y=1.02, x=0.5, xanchor='center', yanchor='bottom')
+            )
+        )
+
+    return _memoize(key, build)
+
+def history_figure(city_name: str, location_id: int, timestamps: np.ndarray, values: np.ndarray,
+                   label: str, unit_label: str, units: str) -> "go.Figure":
+    """Line chart of a downsampled history series"""
+    # Series are at most Config.HISTORY_POINT_BUDGET points, so hashing
+    # them is cheap and any new observation yields a new figure
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(timestamps, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    key = ('history', location_id, city_name, label, units, digest.hexdigest())
+
+    def build() -> "go.Figure":
+        import plotly.graph_objects as go
+
+        return go.Figure(
+            data=[go.Scatter(
+                x=timestamps.astype('datetime64[s]'),
+                y=values.astype(np.float32),
+                mode='lines',
+                name=label,
+                line=dict(color='#74b9ff', width=2)
+            )],
+            layout=_layout(
+                f"{label} History - {city_name}",
+                xaxis_title="Time (UTC)",
+                yaxis_title=f"{label} ({unit_label})",
+                hovermode='x unified'
+            )
+        )
+
+    return _memoize(key, build)
+
+def tile_map_figure(tiles: List[Dict[str, Any]], units: str, center: Tuple[float, float],
+                    zoom: float) -> "go.Figure":
+    """Map of region tiles colored by temperature"""
+    key = ('tiles', tuple((tile['geohash'], dataset_version(tile['weather'])) for tile in tiles), units, center, zoom)
+
+    def build() -> "go.Figure":
+        import plotly.graph_objects as go
+        temp_unit = Config.UNITS_DISPLAY[units]['temp']
+        temps = np.fromiter((tile['weather']['main']['temp'] for tile in tiles), dtype=np.float32, count=len(tiles))
+        hover = [
+            f"{tile['weather'].get('name') or tile['geohash']}<br>"
+            f"{tile['weather']['main']['temp']:.1f}{temp_unit} · "
+            f"{tile['weather']['weather'][0]['description'].title()}"
+            for tile in tiles
+        ]
+
+        return go.Figure(
+            data=[go.Scattermap(
+                lat=np.fromiter((tile['lat'] for tile in tiles), dtype=np.float64, count=len(tiles)),
+                lon=np.fromiter((tile['lon'] for tile in tiles), dtype=np.float64, count=len(tiles)),
+                mode='markers+text',
+                text=[f"{t:.0f}°" for t in temps],
+                textposition='top center',
+                hovertext=hover,
+                hoverinfo='text',
+                marker=dict(size=16, color=temps, colorscale='RdYlBu_r', showscale=True,
+                            colorbar=dict(title=temp_unit))
+            )],
+            layout=_layout(
+                "🗺️ Regional Conditions",
+                height=600,
+                margin=dict(l=0, r=0, t=50, b=0),
+                map=dict(
+                    style='open-street-map',
+                    center=dict(lat=center[0], lon=center[1]),
+                    zoom=zoom
+                )
+            )
+        )
+
+    return _memoize(key, build)
@@ -0,0 +1,73 @@
+# codec.py
+import json
+import logging
+import zlib
+from typing import Any
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# First byte of every encoded entry identifies its format
+FORMAT_MSGPACK = 0x01
+FORMAT_MSGPACK_ZSTD = 0x02
+FORMAT_JSON = 0x03
+FORMAT_JSON_ZLIB = 0x04
+
+try:
+    import msgpack
+    import zstandard
+    HAS_MSGPACK_ZSTD = True
+except ImportError:
+    logger.info("msgpack/zstandard not installed; cache entries use JSON + zlib")
+    HAS_MSGPACK_ZSTD = False
+
+def codec_name() -> str:
+    """Name of the encoding used for new entries"""
+    return "msgpack+zstd" if HAS_MSGPACK_ZSTD else "json+zlib"
+
+def encode(value: Any) -> bytes:
+    """
+    Encode a JSON-compatible value as compact bytes
+
+    Values are serialized with msgpack (JSON when unavailable) and, above
+    Config.CACHE_COMPRESS_MIN_BYTES, compressed with zstd (zlib). Forecast
+    payloads repeat the same keys in every point, so they shrink to a small
+    fraction of their size as Python objects.
+    """
+    if HAS_MSGPACK_ZSTD:
+        body = msgpack.packb(value, use_bin_type=True)
+        if len(body) < Config.CACHE_COMPRESS_MIN_BYTES:
+            return bytes([FORMAT_MSGPACK]) + body
+        return bytes([FORMAT_MSGPACK_ZSTD]) + zstandard.compress(body, Config.CACHE_COMPRESSION_LEVEL)
+
+    body = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    if len(body) < Config.CACHE_COMPRESS_MIN_BYTES:
+        return bytes([FORMAT_JSON]) + body
+    return bytes([FORMAT_JSON_ZLIB]) + zlib.compress(body, 6)
+
+def decode(data: bytes) -> Any:
+    """
+    Decode bytes produced by encode (or plain JSON from older entries)
+
+    Raises:
+        ValueError: If the entry is empty, has an unknown format byte or
+            needs msgpack/zstandard when they are not installed
+    """
+    if not data:
+        raise ValueError("Empty cache entry")
+    fmt, body = data[0], data[1:]
+    if fmt == FORMAT_JSON:
+        return json.loads(body)
+    if fmt == FORMAT_JSON_ZLIB:
+        return json.loads(zlib.decompress(body))
+    if fmt in (FORMAT_MSGPACK, FORMAT_MSGPACK_ZSTD):
+        if not HAS_MSGPACK_ZSTD:
+            raise ValueError("Entry requires msgpack/zstandard, which are not installed")
+        if fmt == FORMAT_MSGPACK_ZSTD:
+            body = zstandard.decompress(body)
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    # Entries written before the codec existed are bare JSON
+    try:
+        return json.loads(data)
+    except ValueError:
+        raise ValueError(f"Unknown cache entry format 0x{fmt:02x}")
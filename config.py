@@ -1,44 +1,162 @@
-# config.py
-import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-class Config:
-    # API Configuration
-    API_KEY = os.getenv("OPENWEATHER_API_KEY", "YOUR_DEFAULT_PUBLIC_KEY_IF_ANY")
-# For a real private key, you'd typically remove the default or make it None.
-# For this public key, keeping it as a default is acceptable, but using os.getenv is safer for private keys.
-    BASE_URL = "https://api.openweathermap.org/data/2.5"
-    GEOCODING_URL = "https://api.openweathermap.org/geo/1.0"
-    
-    # Default Settings
-    DEFAULT_CITY = "London"
-    DEFAULT_UNITS = "metric"  # metric, imperial, standard
-    CACHE_DURATION = 600  # 10 minutes in seconds
-    
-    # Request Settings
-    REQUEST_TIMEOUT = 10  # seconds
-    MAX_RETRIES = 3
-    
-    # UI Settings
-    WEATHER_ICONS = {
-        "01d": "☀️", "01n": "🌙",  # clear sky
-        "02d": "⛅", "02n": "☁️",  # few clouds
-        "03d": "☁️", "03n": "☁️",  # scattered clouds
-        "04d": "☁️", "04n": "☁️",  # broken clouds
-        "09d": "🌧️", "09n": "🌧️", # shower rain
-        "10d": "🌦️", "10n": "🌧️", # rain
-        "11d": "⛈️", "11n": "⛈️",  # thunderstorm
-        "13d": "🌨️", "13n": "🌨️", # snow
-        "50d": "🌫️", "50n": "🌫️"  # mist
-    }
-    
-    # Units mapping
-    UNITS_DISPLAY = {
-        "metric": {"temp": "°C", "speed": "m/s", "pressure": "hPa"},
-        "imperial": {"temp": "°F", "speed": "mph", "pressure": "hPa"},
-        "standard": {"temp": "K", "speed": "m/s", "pressure": "hPa"}
-
-    }
+# config.py
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class Config:
+    # API Configuration
+    API_KEY = os.getenv("OPENWEATHER_API_KEY", "YOUR_DEFAULT_PUBLIC_KEY_IF_ANY")
+# For a real private key, you'd typically remove the default or make it None.
+# For this public key, keeping it as a default is acceptable, but using os.getenv is safer for private keys.
+    BASE_URL = "https://api.openweathermap.org/data/2.5"
+    GEOCODING_URL = "https://api.openweathermap.org/geo/1.0"
+    AIR_QUALITY_URL = f"{BASE_URL}/air_pollution"
+    
+    # Default Settings
+    DEFAULT_CITY = "London"
+    DEFAULT_UNITS = "metric"  # metric, imperial, standard
+    CANONICAL_UNITS = "metric"  # units fetched and cached; others are converted locally
+    CACHE_DURATION = 600  # 10 minutes in seconds
+    CACHE_MAX_ENTRIES = 1024  # entries per in-process cache
+    AQI_CACHE_DURATION = 1800  # air quality updates hourly upstream
+    GEOCODING_CACHE_DURATION = 86400  # city coordinates rarely change
+    LOCATION_ID_CACHE_DURATION = 30 * 86400  # query -> location id mappings
+    VALIDATOR_CACHE_DURATION = 3600  # payloads with an ETag/Last-Modified kept this long for conditional refreshes
+    
+    # Cache Backend Settings
+    CACHE_BACKEND = os.getenv("WEATHER_CACHE_BACKEND", "memory")  # memory, sqlite, redis
+    CACHE_DB_PATH = os.getenv("WEATHER_CACHE_DB", "weather_cache.db")
+    REDIS_URL = os.getenv("WEATHER_REDIS_URL", "redis://localhost:6379/0")
+    REDIS_TIMEOUT = 0.5  # seconds; a slow cache should not delay requests
+    CACHE_KEY_PREFIX = "weather:"  # namespace for keys in shared stores
+    CACHE_MAX_BYTES = 64 * 1024 * 1024  # encoded bytes held by the in-memory backend
+    CACHE_COMPRESS_MIN_BYTES = 256  # smaller entries are stored uncompressed
+    CACHE_COMPRESSION_LEVEL = 3  # zstd level; higher is smaller but slower
+    CACHE_SNAPSHOT_ENABLED = os.getenv("WEATHER_CACHE_SNAPSHOT_ENABLED", "true").lower() == "true"
+    CACHE_SNAPSHOT_PATH = os.getenv("WEATHER_CACHE_SNAPSHOT", "weather_cache.snapshot")
+    CACHE_SNAPSHOT_INTERVAL = 300  # seconds between in-memory cache snapshots
+    AQI_GRID_DEGREES = 0.1  # ~11 km cells shared by nearby locations
+    
+    # Spatial Index Settings
+    SPATIAL_CELL_DEGREES = 0.05  # ~5.5 km grid cells
+    SPATIAL_INDEX_MAX_POINTS = 50000  # oldest points are evicted beyond this
+    COORD_CACHE_RADIUS_KM = 1.0  # reuse observations fetched this close by
+    CITY_INDEX_CELL_DEGREES = 0.5  # coarser cells for the sparser city index
+    
+    # Map Tile Settings
+    TILE_CACHE_DURATION = 600  # seconds before a tile's conditions are refetched
+    TILE_CACHE_MAX_TILES = 4096  # least recently viewed tiles are evicted beyond this
+    TILE_MAX_PER_VIEW = 24  # caps upstream calls for a cold map view, well under the free tier's 60/minute
+    TILE_WORKERS = 4  # threads fetching tiles, apart from the interactive pool
+    TILE_MIN_PRECISION = 2  # geohash length bounds (2 ~ 1250 km, 6 ~ 1.2 km cells)
+    TILE_MAX_PRECISION = 6
+    
+    # Request Settings
+    REQUEST_TIMEOUT = 10  # seconds; upper bound, and the timeout until latencies are known
+    MAX_RETRIES = 3
+    MAX_WORKERS = 8  # interactive worker threads per WeatherAPI instance
+    CONNECTION_POOL_SIZE = 10  # keep-alive connections per host
+    
+    # Adaptive Timeout and Retry Settings
+    LATENCY_WINDOW = 200  # recent latencies kept per endpoint
+    LATENCY_MIN_SAMPLES = 20  # samples needed before timeouts and hedging adapt
+    TIMEOUT_PERCENTILE = 99
+    TIMEOUT_MULTIPLIER = 3.0  # timeout = 3x the endpoint's p99 latency
+    MIN_REQUEST_TIMEOUT = 2.0  # seconds; floor for adaptive timeouts
+    HEDGE_REQUESTS = os.getenv("WEATHER_HEDGE_REQUESTS", "false").lower() == "true"
+    HEDGE_PERCENTILE = 95  # send a duplicate request once the first exceeds p95
+    HEDGE_WORKERS = 4  # threads for hedged duplicates (first attempts run on a pool of CONNECTION_POOL_SIZE)
+    RETRY_BACKOFF_BASE = 0.5  # seconds; jittered backoff cap doubles per attempt
+    RETRY_BACKOFF_MAX = 8.0
+    RETRY_AFTER_MAX = 30  # give up instead of honoring a longer Retry-After
+    RETRY_BUDGET_RATIO = 0.1  # retries and hedges allowed per request
+    RETRY_BUDGET_CAPACITY = 10  # retry tokens that can accumulate
+    
+    # Search Analytics Settings
+    ANALYTICS_BUCKET_SECONDS = 300  # time bucket of the sliding window
+    ANALYTICS_WINDOW_BUCKETS = 12  # buckets kept: one hour of queries
+    ANALYTICS_CAPACITY = 256  # distinct queries tracked per bucket
+    
+    # Request Scheduling
+    # Concurrent upstream calls per priority class, within CONNECTION_POOL_SIZE;
+    # the lower classes' limits keep slots free for interactive requests
+    SCHEDULER_LIMITS = {'interactive': 10, 'batch': 4, 'background': 2}
+    
+    # API Service Settings
+    API_SERVER_HOST = os.getenv("WEATHER_API_HOST", "127.0.0.1")
+    API_SERVER_PORT = int(os.getenv("WEATHER_API_PORT", "8080"))
+    API_SERVER_WORKERS = 32  # threads running blocking client calls
+    API_BATCH_WORKERS = 4  # batch requests run at once; more wait their turn
+    API_MAX_BATCH_CITIES = 50  # cities accepted in one batch request
+    API_GZIP_MIN_BYTES = 1024  # smaller responses are sent uncompressed
+    
+    # Export Settings
+    EXPORT_CHUNK_SIZE = 500  # payloads normalized per chunk in batch exports
+    
+    # History Settings
+    HISTORY_ENABLED = os.getenv("WEATHER_HISTORY_ENABLED", "true").lower() == "true"
+    HISTORY_DB_PATH = os.getenv("WEATHER_HISTORY_DB", "weather_history.db")
+    HISTORY_BATCH_SIZE = 200  # rows per write transaction
+    HISTORY_FLUSH_INTERVAL = 2.0  # seconds before a partial batch is written
+    HISTORY_BLOCK_SIZE = 256  # observations packed into one encoded block per series
+    HISTORY_COORD_TOLERANCE = 0.05  # degrees when matching stored locations
+    HISTORY_POINT_BUDGET = 500  # max points sent to a history chart
+    
+    # Chart Settings
+    FIGURE_CACHE_SIZE = 128  # memoized Plotly figures kept per process
+    FORECAST_SUMMARY_CACHE_SIZE = 256  # memoized daily/hourly forecast aggregates
+    
+    # Startup Settings
+    STARTUP_IMPORT_BUDGET_MS = 1000  # total import time allowed for app.py's imports
+    STARTUP_LAZY_MODULES = ('pandas', 'pyarrow')  # must only load on first use
+    
+    # UI Settings
+    TEMPLATE_CACHE_SIZE = 2048  # memoized rendered HTML fragments
+    COMPARISON_MAX_CITIES = 60  # cities in one many-city comparison
+    SESSION_STORE_MAX_ENTRIES = 5000  # distinct payloads shared by all sessions
+    SESSION_STORE_TTL = 3600  # seconds a payload is kept after any session last showed it
+    SESSION_IDLE_TIMEOUT = 3600  # idle sessions drop their payload references (payloads expire by SESSION_STORE_TTL)
+    WEATHER_ICONS = {
+        "01d": "☀️", "01n": "🌙",  # clear sky
+        "02d": "⛅", "02n": "☁️",  # few clouds
+        "03d": "☁️", "03n": "☁️",  # scattered clouds
+        "04d": "☁️", "04n": "☁️",  # broken clouds
+        "09d": "🌧️", "09n": "🌧️", # shower rain
+        "10d": "🌦️", "10n": "🌧️", # rain
+        "11d": "⛈️", "11n": "⛈️",  # thunderstorm
+        "13d": "🌨️", "13n": "🌨️", # snow
+        "50d": "🌫️", "50n": "🌫️"  # mist
+    }
+    
+    # Normalized city queries that resolve to a canonical query
+    CITY_ALIASES = {
+        "nyc": "new york,us",
+        "new york city": "new york,us",
+        "la": "los angeles,us",
+        "sf": "san francisco,us",
+        "bombay": "mumbai,in",
+        "calcutta": "kolkata,in",
+        "madras": "chennai,in",
+        "peking": "beijing,cn",
+        "saigon": "ho chi minh city,vn",
+        "kiev": "kyiv,ua"
+    }
+    
+    # Air Quality Index levels (OpenWeatherMap scale)
+    AQI_LEVELS = {
+        1: ("Good", "#00b894"),
+        2: ("Fair", "#74b9ff"),
+        3: ("Moderate", "#fdcb6e"),
+        4: ("Poor", "#e17055"),
+        5: ("Very Poor", "#d63031")
+    }
+    
+    # Units mapping
+    UNITS_DISPLAY = {
+        "metric": {"temp": "°C", "speed": "m/s", "pressure": "hPa"},
+        "imperial": {"temp": "°F", "speed": "mph", "pressure": "hPa"},
+        "standard": {"temp": "K", "speed": "m/s", "pressure": "hPa"}
+
+    }
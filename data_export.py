@@ -0,0 +1,180 @@
+# data_export.py
+import importlib.util
+import io
+import logging
+from typing import TYPE_CHECKING, Any, Dict, IO, Iterator, List, Optional, Tuple, Union
+from config import Config
+
+# pandas and pyarrow are imported on first export, not at app startup
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Output column -> dotted path in the flattened OpenWeatherMap payload
+BATCH_EXPORT_COLUMNS = {
+    'city_id': 'id',
+    'name': 'name',
+    'country': 'sys.country',
+    'lat': 'coord.lat',
+    'lon': 'coord.lon',
+    'observed_at': 'dt',
+    'timezone': 'timezone',
+    'temperature': 'main.temp',
+    'feels_like': 'main.feels_like',
+    'temp_min': 'main.temp_min',
+    'temp_max': 'main.temp_max',
+    'pressure': 'main.pressure',
+    'humidity': 'main.humidity',
+    'visibility': 'visibility',
+    'wind_speed': 'wind.speed',
+    'wind_deg': 'wind.deg',
+    'clouds': 'clouds.all',
+    'units': '_metadata.units',
+    'fetch_time': '_metadata.fetch_time',
+}
+
+# Fixed dtypes keep the schema identical across chunks (required by the
+# Parquet/Arrow writers, which are opened once with the first chunk's schema)
+BATCH_EXPORT_DTYPES = {
+    'city_searched': 'string',
+    'city_id': 'Int64',
+    'name': 'string',
+    'country': 'string',
+    'lat': 'float64',
+    'lon': 'float64',
+    'observed_at': 'Int64',
+    'timezone': 'Int64',
+    'temperature': 'float64',
+    'feels_like': 'float64',
+    'temp_min': 'float64',
+    'temp_max': 'float64',
+    'pressure': 'float64',
+    'humidity': 'float64',
+    'visibility': 'float64',
+    'wind_speed': 'float64',
+    'wind_deg': 'float64',
+    'clouds': 'float64',
+    'weather_main': 'string',
+    'weather_description': 'string',
+    'weather_icon': 'string',
+    'units': 'string',
+    'fetch_time': 'float64',
+}
+
+EXPORT_MIME_TYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+    'csv': 'text/csv',
+}
+
+def available_export_formats() -> List[str]:
+    """Return export formats usable with the installed dependencies"""
+    # Check for pyarrow without importing it
+    if importlib.util.find_spec('pyarrow') is None:
+        logger.info("pyarrow not installed; Parquet/Arrow export disabled")
+        return ['csv']
+    return ['parquet', 'arrow', 'csv']
+
+def normalize_weather_batch(cities: List[str], payloads: List[Dict[str, Any]]) -> "pd.DataFrame":
+    """Flatten current-weather payloads into one typed, columnar frame"""
+    import pandas as pd
+
+    flat = pd.json_normalize(payloads)
+    df = pd.DataFrame(index=flat.index)
+    df['city_searched'] = cities
+
+    for column, path in BATCH_EXPORT_COLUMNS.items():
+        df[column] = flat[path] if path in flat.columns else None
+
+    # 'weather' is a list of conditions; the first entry is the primary one
+    primary = flat['weather'].str[0] if 'weather' in flat.columns else pd.Series(index=flat.index, dtype=object)
+    df['weather_main'] = primary.str['main']
+    df['weather_description'] = primary.str['description']
+    df['weather_icon'] = primary.str['icon']
+
+    return df[list(BATCH_EXPORT_DTYPES)].astype(BATCH_EXPORT_DTYPES)
+
+def iter_batch_frames(successful: Dict[str, Dict[str, Any]], chunk_size: Optional[int] = None) -> Iterator["pd.DataFrame"]:
+    """Yield normalized frames over batch results, one chunk at a time"""
+    chunk_size = chunk_size or Config.EXPORT_CHUNK_SIZE
+    items = iter(successful.items())
+
+    while True:
+        chunk: List[Tuple[str, Dict[str, Any]]] = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                break
+        if not chunk:
+            return
+
+        cities, payloads = zip(*chunk)
+        yield normalize_weather_batch(list(cities), list(payloads))
+
+def export_batch_results(results: Dict[str, Any], fmt: str = "parquet",
+                         sink: Union[str, IO[bytes], None] = None,
+                         chunk_size: Optional[int] = None) -> Optional[bytes]:
+    """
+    Export successful results of get_multiple_cities_weather in a columnar format
+
+    Args:
+        results (dict): Return value of WeatherAPI.get_multiple_cities_weather
+        fmt (str): One of 'parquet', 'arrow' or 'csv'
+        sink: File path or binary file object; when omitted the bytes are returned
+        chunk_size (int): Payloads normalized per chunk
+
+    Returns:
+        Exported bytes when no sink was given, otherwise None
+    """
+    if fmt not in EXPORT_MIME_TYPES:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    buffer = io.BytesIO() if sink is None else None
+    target = buffer if buffer is not None else sink
+    frames = iter_batch_frames(results.get('successful', {}), chunk_size)
+
+    if fmt == 'csv':
+        _write_csv(frames, target)
+    else:
+        _write_arrow(frames, target, fmt)
+
+    logger.info(f"Exported {len(results.get('successful', {}))} cities as {fmt}")
+    return buffer.getvalue() if buffer is not None else None
+
+def _write_csv(frames: Iterator["pd.DataFrame"], target: Union[str, IO[bytes]]):
+    """Append CSV chunks to the target, writing the header once"""
+    handle = open(target, 'wb') if isinstance(target, str) else target
+    try:
+        header = True
+        for df in frames:
+            handle.write(df.to_csv(index=False, header=header).encode('utf-8'))
+            header = False
+        if header:
+            handle.write(','.join(BATCH_EXPORT_DTYPES).encode('utf-8') + b'\n')
+    finally:
+        if isinstance(target, str):
+            handle.close()
+
+def _write_arrow(frames: Iterator["pd.DataFrame"], target: Union[str, IO[bytes]], fmt: str):
+    """Stream chunks into a Parquet file or Arrow IPC file"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(f"pyarrow is required for {fmt} export. Install it with 'pip install pyarrow'.")
+    import pandas as pd
+
+    empty = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in BATCH_EXPORT_DTYPES.items()})
+    schema = pa.Schema.from_pandas(empty, preserve_index=False)
+
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(target, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(target, schema)
+
+    try:
+        for df in frames:
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+    finally:
+        writer.close()
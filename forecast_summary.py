@@ -0,0 +1,99 @@
+# forecast_summary.py
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List
+import numpy as np
+from config import Config
+from cache import TTLCache, dataset_version
+from units import payload_units
+
+# OpenWeatherMap forecasts have one point every 3 hours
+POINTS_PER_DAY = 8
+MAX_FORECAST_DAYS = 5
+
+# Derived aggregates per (dataset version, units); the version includes the
+# location, body fingerprint and number of points, so each day slice of a
+# fetch is summarized once
+_daily_cache = TTLCache(maxsize=Config.FORECAST_SUMMARY_CACHE_SIZE, ttl=Config.CACHE_DURATION)
+_hourly_cache = TTLCache(maxsize=Config.FORECAST_SUMMARY_CACHE_SIZE, ttl=Config.CACHE_DURATION)
+
+def slice_forecast(data: Dict[str, Any], days: int) -> Dict[str, Any]:
+    """
+    First days of a full forecast payload
+
+    Returns a shallow copy holding the same points the upstream would return
+    for cnt=days*8; the input is not modified.
+    """
+    items = data.get('list', [])[:days * POINTS_PER_DAY]
+    return dict(
+        data,
+        list=items,
+        cnt=len(items),
+        _metadata=dict(data.get('_metadata', {}), days_requested=days)
+    )
+
+def _summary_key(data: Dict[str, Any]) -> tuple:
+    return dataset_version(data), payload_units(data)
+
+def hourly_series(data: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Per-point forecast fields as arrays (times, temperature, humidity, wind, precipitation chance)"""
+    key = _summary_key(data)
+    series = _hourly_cache.get(key)
+    if series is not None:
+        return series
+
+    items = data.get('list', [])
+    count = len(items)
+    series = {
+        'time': np.array([datetime.fromtimestamp(item['dt']) for item in items], dtype='datetime64[s]'),
+        'temp': np.fromiter((item['main']['temp'] for item in items), dtype=np.float64, count=count),
+        'humidity': np.fromiter((item['main']['humidity'] for item in items), dtype=np.float64, count=count),
+        'wind_speed': np.fromiter((item['wind']['speed'] for item in items), dtype=np.float64, count=count),
+        'pop': np.fromiter((item.get('pop', 0.0) for item in items), dtype=np.float64, count=count),
+    }
+    _hourly_cache.set(key, series)
+    return series
+
+def daily_summaries(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Per-day summary of a forecast payload, in the payload's units
+
+    Points are grouped by local calendar date. Each day carries its min and
+    max temperature, mean humidity and wind speed, and its most frequent
+    condition and icon.
+
+    Args:
+        data (Dict): Forecast payload
+
+    Returns:
+        List of day summaries in date order
+    """
+    key = _summary_key(data)
+    summaries = _daily_cache.get(key)
+    if summaries is not None:
+        return summaries
+
+    series = hourly_series(data)
+    items = data.get('list', [])
+    dates = series['time'].astype('datetime64[D]')
+    summaries = []
+    for date in np.unique(dates):
+        index = np.flatnonzero(dates == date)
+        conditions = Counter(items[i]['weather'][0]['description'] for i in index)
+        icons = Counter(items[i]['weather'][0]['icon'] for i in index)
+        summaries.append({
+            'date': date.item(),
+            'condition': conditions.most_common(1)[0][0],
+            'icon': icons.most_common(1)[0][0],
+            'min_temp': float(series['temp'][index].min()),
+            'max_temp': float(series['temp'][index].max()),
+            'avg_humidity': float(series['humidity'][index].mean()),
+            'avg_wind': float(series['wind_speed'][index].mean()),
+            'points': len(index)
+        })
+    _daily_cache.set(key, summaries)
+    return summaries
+
+def summary_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters of the daily and hourly aggregate caches"""
+    return {'daily': _daily_cache.stats(), 'hourly': _hourly_cache.stats()}
@@ -0,0 +1,558 @@
+# history_store.py
+import atexit
+import json
+import logging
+import queue
+from contextlib import closing
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config import Config
+from units import convert_series
+
+logger = logging.getLogger(__name__)
+
+# Measurement columns stored for every observation
+MEASUREMENT_FIELDS = [
+    'temp', 'feels_like', 'temp_min', 'temp_max', 'pressure',
+    'humidity', 'wind_speed', 'wind_deg', 'clouds'
+]
+
+# Fixed-point scale per field; values are stored as round(value * scale)
+FIELD_SCALES = {
+    'temp': 100, 'feels_like': 100, 'temp_min': 100, 'temp_max': 100,
+    'pressure': 10, 'humidity': 1, 'wind_speed': 100, 'wind_deg': 1, 'clouds': 1
+}
+
+# Quantized stand-in for a missing measurement
+NULL_VALUE = np.iinfo(np.int64).min
+
+# Static city metadata is stored once per location. New observations land
+# in recent_observations and are packed into delta/varint encoded
+# series_blocks once a series has Config.HISTORY_BLOCK_SIZE rows.
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS locations (
+    location_id INTEGER PRIMARY KEY,
+    name TEXT,
+    country TEXT,
+    lat REAL,
+    lon REAL,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_locations_name ON locations (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_locations_coord ON locations (lat, lon);
+CREATE TABLE IF NOT EXISTS recent_observations (
+    location_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    units TEXT NOT NULL,
+    {', '.join(f'{field} REAL' for field in MEASUREMENT_FIELDS)},
+    condition TEXT,
+    icon TEXT,
+    fetch_time REAL,
+    PRIMARY KEY (location_id, kind, units, ts)
+);
+CREATE TABLE IF NOT EXISTS series_blocks (
+    location_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    units TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    ts BLOB NOT NULL,
+    {', '.join(f'{field} BLOB' for field in MEASUREMENT_FIELDS)},
+    labels BLOB,
+    PRIMARY KEY (location_id, kind, units, start_ts)
+);
+"""
+
+RECENT_COLUMNS = ['location_id', 'kind', 'ts', 'units'] + MEASUREMENT_FIELDS + ['condition', 'icon', 'fetch_time']
+
+_STOP = object()
+_FLUSH = object()
+
+class HistoryStore:
+    """
+    Append-only SQLite store of fetched observations
+
+    Writes are queued and flushed in batches by a background thread so the
+    request path only pays for a queue put. The same thread packs full
+    series into compressed blocks, which keeps year-scale history for
+    thousands of cities to a few bytes per observation.
+    """
+
+    def __init__(self, db_path: str = None, batch_size: int = None, flush_interval: float = None,
+                 block_size: int = None):
+        self.db_path = db_path or Config.HISTORY_DB_PATH
+        self.batch_size = batch_size or Config.HISTORY_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.HISTORY_FLUSH_INTERVAL
+        self.block_size = block_size or Config.HISTORY_BLOCK_SIZE
+        self._queue: "queue.Queue" = queue.Queue()
+
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+        self._closed = False
+        self._writer = threading.Thread(target=self._writer_loop, name="history-writer", daemon=True)
+        self._writer.start()
+        # The writer is a daemon thread; write out the last interval on exit
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; each thread uses its own"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Move rows from the original single-table layout into the split schema"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'observations'"
+        ).fetchone()
+        if not exists:
+            return
+
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO locations (location_id, name, country, lat, lon, updated_at) "
+                "SELECT location_id, name, country, lat, lon, MAX(fetch_time) FROM observations GROUP BY location_id"
+            )
+            conn.execute(
+                f"INSERT OR IGNORE INTO recent_observations ({', '.join(RECENT_COLUMNS)}) "
+                f"SELECT {', '.join(RECENT_COLUMNS)} FROM observations"
+            )
+            conn.execute("DROP TABLE observations")
+        logger.info("Migrated history to the split location/series layout")
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def record_weather(self, data: Dict[str, Any]):
+        """Queue a current-weather payload for storage"""
+        try:
+            location = (
+                data['id'], data.get('name'), data.get('sys', {}).get('country'),
+                data['coord']['lat'], data['coord']['lon']
+            )
+            units = data.get('_metadata', {}).get('units', Config.DEFAULT_UNITS)
+            fetch_time = data.get('_metadata', {}).get('fetch_time', time.time())
+            self._queue.put([_build_row(location, 'current', units, fetch_time, data)])
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Skipping history record for malformed weather payload: {e}")
+
+    def record_forecast(self, data: Dict[str, Any]):
+        """Queue every point of a forecast payload for storage"""
+        try:
+            city = data['city']
+            location = (
+                city['id'], city.get('name'), city.get('country'),
+                city['coord']['lat'], city['coord']['lon']
+            )
+            units = data.get('_metadata', {}).get('units', Config.DEFAULT_UNITS)
+            fetch_time = data.get('_metadata', {}).get('fetch_time', time.time())
+            rows = [_build_row(location, 'forecast', units, fetch_time, item) for item in data['list']]
+            self._queue.put(rows)
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Skipping history record for malformed forecast payload: {e}")
+
+    def _writer_loop(self):
+        """Drain the queue and write rows in batches"""
+        conn = self._connect()
+        self._compact(conn)
+        pending: List[Tuple] = []
+        received = 0
+        first_pending = None
+        stopping = False
+
+        while not stopping:
+            timeout = self.flush_interval if first_pending is None else \
+                max(0.0, self.flush_interval - (time.time() - first_pending))
+            force = False
+            try:
+                item = self._queue.get(timeout=timeout)
+                received += 1
+                if item is _STOP:
+                    stopping = force = True
+                elif item is _FLUSH:
+                    force = True
+                else:
+                    pending.extend(item)
+                    first_pending = first_pending or time.time()
+            except queue.Empty:
+                pass
+
+            due = first_pending is not None and time.time() - first_pending >= self.flush_interval
+            if pending and (force or due or len(pending) >= self.batch_size):
+                self._write_batch(conn, pending)
+                self._compact(conn)
+                pending = []
+                first_pending = None
+
+            if not pending:
+                for _ in range(received):
+                    self._queue.task_done()
+                received = 0
+
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, rows: List[Tuple]):
+        """Insert a batch of rows in one transaction"""
+        placeholders = ', '.join('?' for _ in RECENT_COLUMNS)
+        # Current observations are append-only; a newer forecast for the same
+        # slot supersedes the older prediction
+        sql_current = f"INSERT OR IGNORE INTO recent_observations ({', '.join(RECENT_COLUMNS)}) VALUES ({placeholders})"
+        sql_forecast = f"INSERT OR REPLACE INTO recent_observations ({', '.join(RECENT_COLUMNS)}) VALUES ({placeholders})"
+
+        # Rows carry (location_id, name, country, lat, lon) up front; the
+        # metadata is stored once per location with the latest values
+        locations = {row[0]: row[:5] + (row[-1],) for row in rows}
+        measurements = [row[:1] + row[5:] for row in rows]
+
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO locations (location_id, name, country, lat, lon, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", list(locations.values())
+                )
+                conn.executemany(sql_current, [row for row in measurements if row[1] == 'current'])
+                conn.executemany(sql_forecast, [row for row in measurements if row[1] == 'forecast'])
+            logger.info(f"Stored {len(rows)} observations in history")
+        except sqlite3.Error as e:
+            logger.error(f"Error writing history batch: {e}")
+
+    def _compact(self, conn: sqlite3.Connection):
+        """Pack series with at least block_size recent rows into encoded blocks"""
+        # Forecast slots can still be replaced by newer forecasts until they pass
+        now = int(time.time())
+        eligible = "(kind = 'current' OR ts < ?)"
+        try:
+            series = conn.execute(
+                f"SELECT location_id, kind, units FROM recent_observations WHERE {eligible} "
+                f"GROUP BY location_id, kind, units HAVING COUNT(*) >= ?", (now, self.block_size)
+            ).fetchall()
+
+            for location_id, kind, units in series:
+                where = f"location_id = ? AND kind = ? AND units = ? AND {eligible}"
+                params = (location_id, kind, units, now)
+                rows = conn.execute(
+                    f"SELECT ts, {', '.join(MEASUREMENT_FIELDS)}, condition, icon "
+                    f"FROM recent_observations WHERE {where} ORDER BY ts", params
+                ).fetchall()
+
+                # A block can already start at this timestamp, e.g. when an
+                # observation is refetched after its series was packed; merge
+                # it rather than replace it
+                existing = conn.execute(
+                    f"SELECT ts, {', '.join(MEASUREMENT_FIELDS)}, labels FROM series_blocks "
+                    f"WHERE location_id = ? AND kind = ? AND units = ? AND start_ts = ?",
+                    (location_id, kind, units, rows[0][0])
+                ).fetchone()
+                if existing:
+                    merged = {row[0]: row for row in block_rows(existing)}
+                    merged.update((row[0], row) for row in rows)
+                    rows = [merged[ts] for ts in sorted(merged)]
+
+                block = encode_block(rows)
+                columns = ['location_id', 'kind', 'units', 'start_ts', 'end_ts', 'count'] + list(block)
+                with conn:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO series_blocks ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' for _ in columns)})",
+                        (location_id, kind, units, rows[0][0], rows[-1][0], len(rows)) + tuple(block.values())
+                    )
+                    conn.execute(f"DELETE FROM recent_observations WHERE {where}", params)
+                logger.info(f"Packed {len(rows)} {kind} observations for location {location_id} into a block")
+        except sqlite3.Error as e:
+            logger.error(f"Error compacting history: {e}")
+
+    def flush(self):
+        """Block until all queued observations have been written"""
+        # close() already wrote everything and the writer is gone
+        if self._closed:
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """Write every queued observation and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        # Observations queued before the stop marker are written before it
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+    def find_location(self, city: str = None, lat: float = None, lon: float = None) -> Optional[int]:
+        """Resolve a city name or coordinates to a stored location id"""
+        with closing(self._connect()) as conn:
+            if city is not None:
+                name = city.split(',')[0].strip()
+                row = conn.execute(
+                    "SELECT location_id FROM locations WHERE name = ? COLLATE NOCASE "
+                    "ORDER BY updated_at DESC LIMIT 1", (name,)
+                ).fetchone()
+            elif lat is not None and lon is not None:
+                tolerance = Config.HISTORY_COORD_TOLERANCE
+                row = conn.execute(
+                    "SELECT location_id FROM locations "
+                    "WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ? "
+                    "ORDER BY (lat - ?) * (lat - ?) + (lon - ?) * (lon - ?) LIMIT 1",
+                    (lat - tolerance, lat + tolerance, lon - tolerance, lon + tolerance,
+                     lat, lat, lon, lon)
+                ).fetchone()
+            else:
+                raise ValueError("Either city or lat/lon is required")
+        return row[0] if row else None
+
+    def query(self, location_id: int, start: float = None, end: float = None,
+              kind: str = 'current', units: str = None,
+              bucket_seconds: int = None) -> Dict[str, List[Any]]:
+        """
+        Query stored observations for a location
+
+        Args:
+            location_id (int): Location id (see find_location)
+            start (float): Inclusive start Unix timestamp
+            end (float): Inclusive end Unix timestamp
+            kind (str): 'current' for observations or 'forecast' for predictions
+            units (str): Units the observations were fetched in
+            bucket_seconds (int): Average observations into buckets of this size
+
+        Returns:
+            Dict mapping column name to a list of values ordered by time
+        """
+        arrays = self.query_arrays(location_id, start=start, end=end, kind=kind, units=units)
+
+        if bucket_seconds and len(arrays['ts']):
+            buckets = (arrays['ts'] // int(bucket_seconds)) * int(bucket_seconds)
+            bucket_ts, starts = np.unique(buckets, return_index=True)
+            averaged = {'ts': bucket_ts}
+            for field in MEASUREMENT_FIELDS:
+                values = arrays[field]
+                valid = ~np.isnan(values)
+                sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+                counts = np.add.reduceat(valid.astype(np.int64), starts)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    averaged[field] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+            arrays = averaged
+
+        # Missing measurements are None, as they were when read from SQL
+        return {
+            column: [None if value != value else value for value in arrays[column].tolist()]
+            for column in ['ts'] + MEASUREMENT_FIELDS
+        }
+
+    def query_arrays(self, location_id: int, start: float = None, end: float = None,
+                     kind: str = 'current', units: str = None,
+                     fields: List[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Query stored observations as NumPy arrays
+
+        Encoded blocks overlapping the range are decoded and merged with
+        the recent rows. Missing measurements are NaN.
+
+        Returns:
+            Dict with int64 'ts' and a float64 array per requested field
+        """
+        units = units or Config.DEFAULT_UNITS
+        fields = fields or MEASUREMENT_FIELDS
+        start = int(start) if start is not None else 0
+        end = int(end) if end is not None else int(time.time()) + 6 * 86400
+        series = (location_id, kind, units)
+
+        with closing(self._connect()) as conn:
+            blocks = conn.execute(
+                f"SELECT ts, {', '.join(fields)} FROM series_blocks "
+                f"WHERE location_id = ? AND kind = ? AND units = ? AND end_ts >= ? AND start_ts <= ? "
+                f"ORDER BY start_ts", series + (start, end)
+            ).fetchall()
+            rows = conn.execute(
+                f"SELECT ts, {', '.join(fields)} FROM recent_observations "
+                f"WHERE location_id = ? AND kind = ? AND units = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                series + (start, end)
+            ).fetchall()
+
+        parts = [decode_block(block, fields) for block in blocks]
+        if rows:
+            parts.append({
+                'ts': np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+                **{field: np.array([row[i + 1] for row in rows], dtype=np.float64) for i, field in enumerate(fields)}
+            })
+        if not parts:
+            return {'ts': np.empty(0, dtype=np.int64), **{field: np.empty(0) for field in fields}}
+
+        ts = np.concatenate([part['ts'] for part in parts])
+        order = np.argsort(ts, kind='stable')
+        ts = ts[order]
+        # Recent rows come last, so the latest copy of a repeated timestamp wins
+        keep = np.append(ts[1:] != ts[:-1], True) & (ts >= start) & (ts <= end)
+        result = {'ts': ts[keep]}
+        for field in fields:
+            result[field] = np.concatenate([part[field] for part in parts])[order][keep]
+        return result
+
+    def query_series(self, location_id: int, field: str = 'temp', start: float = None,
+                     end: float = None, units: str = None,
+                     max_points: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Query one measurement as arrays downsampled to a fixed point budget
+
+        Observations are recorded in Config.CANONICAL_UNITS and converted
+        to units here.
+
+        Returns:
+            Tuple of (timestamps, values) with at most max_points entries
+        """
+        if field not in MEASUREMENT_FIELDS:
+            raise ValueError(f"Unknown history field: {field}")
+
+        data = self.query_arrays(location_id, start=start, end=end, units=Config.CANONICAL_UNITS, fields=[field])
+        ts = data['ts']
+        values = convert_series(field, data[field], Config.CANONICAL_UNITS, units or Config.DEFAULT_UNITS)
+
+        valid = ~np.isnan(values)
+        return downsample_lttb(ts[valid], values[valid], max_points or Config.HISTORY_POINT_BUDGET)
+
+    def locations(self) -> List[Dict[str, Any]]:
+        """List stored locations with their observation counts"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT l.location_id, l.name, l.country, l.lat, l.lon, SUM(s.n), MIN(s.first_ts), MAX(s.last_ts) "
+                "FROM locations l JOIN ("
+                "  SELECT location_id, COUNT(*) AS n, MIN(ts) AS first_ts, MAX(ts) AS last_ts "
+                "  FROM recent_observations WHERE kind = 'current' GROUP BY location_id "
+                "  UNION ALL "
+                "  SELECT location_id, SUM(count), MIN(start_ts), MAX(end_ts) "
+                "  FROM series_blocks WHERE kind = 'current' GROUP BY location_id"
+                ") s ON s.location_id = l.location_id GROUP BY l.location_id ORDER BY l.name"
+            ).fetchall()
+        keys = ['location_id', 'name', 'country', 'lat', 'lon', 'count', 'first_ts', 'last_ts']
+        return [dict(zip(keys, row)) for row in rows]
+
+def _build_row(location: Tuple, kind: str, units: str, fetch_time: float, item: Dict[str, Any]) -> Tuple:
+    """Flatten one observation into a row tuple"""
+    main = item.get('main', {})
+    wind = item.get('wind', {})
+    weather = (item.get('weather') or [{}])[0]
+    return location + (kind, int(item['dt']), units) + (
+        main.get('temp'), main.get('feels_like'), main.get('temp_min'), main.get('temp_max'),
+        main.get('pressure'), main.get('humidity'), wind.get('speed'), wind.get('deg'),
+        item.get('clouds', {}).get('all'), weather.get('description'), weather.get('icon'),
+        fetch_time
+    )
+
+def downsample_lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a series with Largest-Triangle-Three-Buckets
+
+    Keeps the first and last points and, for every bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket, which preserves peaks and troughs.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    xf = x.astype(np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xf[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        areas = np.abs(
+            (xf[a] - avg_x) * (y[lo:hi] - y[a]) - (xf[a] - xf[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(areas))
+        keep[i + 1] = a
+
+    return x[keep], y[keep]
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """
+    Delta, zigzag and LEB128 varint encode an int64 series
+
+    Consecutive observations differ little, so most deltas fit in one or
+    two bytes. Arithmetic wraps modulo 2**64, so any int64 round-trips.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    if not len(values):
+        return b''
+    deltas = np.diff(values, prepend=np.int64(0))
+    zigzag = (deltas.view(np.uint64) << np.uint64(1)) ^ (deltas >> np.int64(63)).view(np.uint64)
+
+    lengths = np.ones(len(zigzag), dtype=np.int64)
+    rest = zigzag >> np.uint64(7)
+    while rest.any():
+        lengths += rest > 0
+        rest >>= np.uint64(7)
+
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    for k in range(int(lengths.max())):
+        mask = lengths > k
+        byte = (zigzag[mask] >> np.uint64(7 * k)) & np.uint64(0x7f)
+        more = (lengths[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[mask] + k] = (byte | more).astype(np.uint8)
+    return out.tobytes()
+
+def decode_varints(data: bytes) -> np.ndarray:
+    """Decode bytes from encode_varints back into an int64 array"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.empty(0, dtype=np.int64)
+
+    ends = (raw & 0x80) == 0
+    starts = np.flatnonzero(np.concatenate(([True], ends[:-1])))
+    value_index = np.cumsum(ends) - ends
+    shifts = (np.arange(len(raw)) - starts[value_index]) * 7
+    # Each byte contributes disjoint bits, so summing per value is an OR
+    parts = (raw & 0x7f).astype(np.uint64) << shifts.astype(np.uint64)
+    zigzag = np.add.reduceat(parts, starts)
+
+    deltas = (zigzag >> np.uint64(1)) ^ (np.uint64(0) - (zigzag & np.uint64(1)))
+    return np.cumsum(deltas.view(np.int64))
+
+def encode_block(rows: List[Tuple]) -> Dict[str, bytes]:
+    """Encode (ts, *MEASUREMENT_FIELDS, condition, icon) rows into column blobs"""
+    block = {'ts': encode_varints(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)))}
+    for i, field in enumerate(MEASUREMENT_FIELDS, start=1):
+        values = np.array([row[i] for row in rows], dtype=np.float64)
+        missing = np.isnan(values)
+        quantized = np.round(np.where(missing, 0.0, values) * FIELD_SCALES[field]).astype(np.int64)
+        quantized[missing] = NULL_VALUE
+        block[field] = encode_varints(quantized)
+    labels = [row[-2:] for row in rows]
+    block['labels'] = zlib.compress(json.dumps(labels, separators=(',', ':')).encode('utf-8'))
+    return block
+
+def decode_block(block: Tuple, fields: List[str]) -> Dict[str, np.ndarray]:
+    """Decode a (ts, *fields) row of series_blocks into arrays"""
+    result = {'ts': decode_varints(block[0])}
+    for field, data in zip(fields, block[1:]):
+        quantized = decode_varints(data)
+        values = quantized / FIELD_SCALES[field]
+        values[quantized == NULL_VALUE] = np.nan
+        result[field] = values
+    return result
+
+def block_rows(block: Tuple) -> List[Tuple]:
+    """Decode a (ts, *MEASUREMENT_FIELDS, labels) row of series_blocks back into rows"""
+    arrays = decode_block(block[:-1], MEASUREMENT_FIELDS)
+    labels = json.loads(zlib.decompress(block[-1]).decode('utf-8'))
+    columns = [arrays['ts'].tolist()] + [arrays[field].tolist() for field in MEASUREMENT_FIELDS]
+    return [tuple(values) + tuple(label) for values, label in zip(zip(*columns), labels)]
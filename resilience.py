@@ -0,0 +1,131 @@
+# resilience.py
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional
+from config import Config
+
+# Upstream statuses worth retrying
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class LatencyTracker:
+    """
+    Recent response times per endpoint
+
+    Timeouts and hedge delays are derived from the observed percentiles
+    instead of a flat limit, so a healthy endpoint fails fast on a stalled
+    connection while a slow one is not cut off prematurely.
+    """
+
+    def __init__(self, window: int = None):
+        self.window = window or Config.LATENCY_WINDOW
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float):
+        """Add an observed latency (a timeout counts as its full duration)"""
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, endpoint: str, q: float) -> Optional[float]:
+        """q-th percentile latency, or None until enough samples are seen"""
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < Config.LATENCY_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    def timeout(self, endpoint: str) -> float:
+        """Request timeout for an endpoint"""
+        p99 = self.percentile(endpoint, Config.TIMEOUT_PERCENTILE)
+        if p99 is None:
+            return Config.REQUEST_TIMEOUT
+        return min(Config.REQUEST_TIMEOUT, max(Config.MIN_REQUEST_TIMEOUT, p99 * Config.TIMEOUT_MULTIPLIER))
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """How long to wait before sending a hedged duplicate, if hedging applies"""
+        return self.percentile(endpoint, Config.HEDGE_PERCENTILE)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Sample count and p50/p95/p99 per endpoint"""
+        with self._lock:
+            endpoints = list(self._samples)
+        return {
+            endpoint: {
+                'samples': len(self._samples[endpoint]),
+                'p50': self.percentile(endpoint, 50),
+                'p95': self.percentile(endpoint, 95),
+                'p99': self.percentile(endpoint, 99),
+                'timeout': self.timeout(endpoint)
+            }
+            for endpoint in endpoints
+        }
+
+class RetryBudget:
+    """
+    Token bucket limiting retries and hedges to a fraction of requests
+
+    Each request deposits Config.RETRY_BUDGET_RATIO tokens and each retry
+    or hedge spends one. When the upstream is down, retries stop once the
+    budget is drained instead of multiplying the load on it.
+    """
+
+    def __init__(self, ratio: float = None, capacity: float = None):
+        self.ratio = ratio if ratio is not None else Config.RETRY_BUDGET_RATIO
+        self.capacity = capacity if capacity is not None else Config.RETRY_BUDGET_CAPACITY
+        self._tokens = self.capacity
+        self._lock = threading.Lock()
+        self.spent = 0
+        self.denied = 0
+
+    def record_request(self):
+        """Credit the budget for an original request"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take a token for a retry; False when the budget is exhausted"""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.spent += 1
+                return True
+            self.denied += 1
+            return False
+
+    def stats(self) -> Dict[str, float]:
+        """Remaining tokens and retries spent or denied"""
+        with self._lock:
+            return {'tokens': self._tokens, 'spent': self.spent, 'denied': self.denied}
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Delay before retry number attempt (0-based)
+
+    Full jitter: uniform between zero and an exponentially growing cap, so
+    clients that failed together do not retry together. A Retry-After from
+    the server is honored as a lower bound.
+    """
+    cap = min(Config.RETRY_BACKOFF_MAX, Config.RETRY_BACKOFF_BASE * (2 ** attempt))
+    delay = random.uniform(0, cap)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
@@ -0,0 +1,104 @@
+# scheduler.py
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator
+from config import Config
+
+# Request classes, highest priority first
+PRIORITIES = ('interactive', 'batch', 'background')
+
+_priority: contextvars.ContextVar = contextvars.ContextVar('request_priority', default='interactive')
+
+def current_priority() -> str:
+    """Priority class of upstream calls made from the current context"""
+    return _priority.get()
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """Run the enclosed calls in a priority class"""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{name}'; expected one of {', '.join(PRIORITIES)}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def run_with_priority(name: str, fn: Callable, *args) -> Any:
+    """Call fn in a priority class (for work handed to another thread)"""
+    with priority(name):
+        return fn(*args)
+
+class RequestScheduler:
+    """
+    Admission control for upstream calls by priority class
+
+    Each class has its own concurrency limit and a FIFO queue, and all
+    classes share Config.CONNECTION_POOL_SIZE slots. A freed slot goes to
+    the highest-priority class with a waiter it can admit, so queued batch
+    or prefetch work never delays an interactive request, and the batch and
+    background limits keep slots free for interactive traffic.
+    """
+
+    def __init__(self, limits: Dict[str, int] = None, total: int = None):
+        self.limits = dict(limits or Config.SCHEDULER_LIMITS)
+        self.total = total or Config.CONNECTION_POOL_SIZE
+        self._active = {name: 0 for name in PRIORITIES}
+        self._queues: Dict[str, Deque[object]] = {name: deque() for name in PRIORITIES}
+        self._admitted = {name: 0 for name in PRIORITIES}
+        self._max_wait = {name: 0.0 for name in PRIORITIES}
+        self._cond = threading.Condition()
+
+    def _can_admit(self, name: str, ticket: object) -> bool:
+        if self._queues[name][0] is not ticket:
+            return False
+        if self._active[name] >= self.limits[name] or sum(self._active.values()) >= self.total:
+            return False
+        # A higher class waiting for a slot it could use goes first
+        for higher in PRIORITIES[:PRIORITIES.index(name)]:
+            if self._queues[higher] and self._active[higher] < self.limits[higher]:
+                return False
+        return True
+
+    @contextmanager
+    def slot(self, name: str = None) -> Iterator[None]:
+        """Hold one upstream slot in a class (the context's class by default)"""
+        name = name or current_priority()
+        ticket = object()
+        start = time.monotonic()
+        with self._cond:
+            queue = self._queues[name]
+            queue.append(ticket)
+            try:
+                while not self._can_admit(name, ticket):
+                    self._cond.wait()
+            finally:
+                queue.remove(ticket)
+                # The next ticket in line may be admissible now
+                self._cond.notify_all()
+            self._active[name] += 1
+            self._admitted[name] += 1
+            self._max_wait[name] = max(self._max_wait[name], time.monotonic() - start)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active[name] -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Active, queued and admitted calls plus the longest wait per class"""
+        with self._cond:
+            return {
+                name: {
+                    'limit': self.limits[name],
+                    'active': self._active[name],
+                    'queued': len(self._queues[name]),
+                    'admitted': self._admitted[name],
+                    'max_wait': self._max_wait[name]
+                }
+                for name in PRIORITIES
+            }
@@ -0,0 +1,294 @@
+# spatial.py
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from config import Config
+
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class SpatialIndex:
+    """
+    Grid index of points for radius and nearest-neighbour lookups
+
+    Points are bucketed into lat/lon cells. Queries scan rings of cells
+    outward from the query point and stop once no unscanned cell can hold
+    a closer point, so lookups touch only a handful of cells.
+    """
+
+    def __init__(self, cell_degrees: float = None, maxsize: int = None, max_age: float = None):
+        self.cell_degrees = cell_degrees or Config.SPATIAL_CELL_DEGREES
+        self.maxsize = maxsize or Config.SPATIAL_INDEX_MAX_POINTS
+        # Points older than this are dropped as new ones arrive
+        self.max_age = max_age
+        # key -> (cell, lat, lon, value, timestamp), oldest first
+        self._points: "OrderedDict[Hashable, Tuple[Tuple[int, int], float, float, Any, float]]" = OrderedDict()
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, None]] = {}
+        # latitude row -> occupied cells in that row
+        self._rows: Dict[int, Dict[Tuple[int, int], None]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def stats(self) -> Dict[str, int]:
+        """Point and cell counts and approximate memory held by the index"""
+        with self._lock:
+            size = sys.getsizeof(self._points) + sys.getsizeof(self._cells) + sys.getsizeof(self._rows)
+            for key, point in self._points.items():
+                size += sys.getsizeof(key) + sys.getsizeof(point) + sys.getsizeof(point[3])
+            size += sum(sys.getsizeof(members) for members in self._cells.values())
+            size += sum(sys.getsizeof(row) for row in self._rows.values())
+            return {'points': len(self._points), 'cells': len(self._cells), 'bytes': size}
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lon / self.cell_degrees))
+
+    def insert(self, key: Hashable, lat: float, lon: float, value: Any, timestamp: float = None):
+        """Add or replace a point, evicting expired points and the oldest when full"""
+        with self._lock:
+            self._remove(key)
+            cell = self._cell(lat, lon)
+            self._points[key] = (cell, lat, lon, value, timestamp if timestamp is not None else time.time())
+            self._cells.setdefault(cell, {})[key] = None
+            self._rows.setdefault(cell[0], {})[cell] = None
+
+            if self.max_age is not None:
+                # Points are kept in insertion order, so expired ones lead
+                cutoff = time.time() - self.max_age
+                while self._points:
+                    oldest = next(iter(self._points))
+                    if self._points[oldest][4] >= cutoff:
+                        break
+                    self._remove(oldest)
+            while len(self._points) > self.maxsize:
+                self._remove(next(iter(self._points)))
+
+    def remove(self, key: Hashable):
+        """Remove a point if present"""
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        members = self._cells.get(point[0])
+        if members is not None:
+            members.pop(key, None)
+            if not members:
+                del self._cells[point[0]]
+                row = self._rows[point[0][0]]
+                row.pop(point[0], None)
+                if not row:
+                    del self._rows[point[0][0]]
+
+    def _ring(self, center: Tuple[int, int], radius: int) -> List[Tuple[int, int]]:
+        """Cells at Chebyshev distance radius from center, wrapping at the antimeridian"""
+        ci, cj = center
+        if radius == 0:
+            return [center]
+        lon_cells = round(360 / self.cell_degrees)
+        half = lon_cells // 2
+        cells = []
+        for di in range(-radius, radius + 1):
+            if abs(di) == radius:
+                offsets = range(-radius, radius + 1)
+            else:
+                offsets = (-radius, radius)
+            cells.extend((ci + di, (cj + dj + half) % lon_cells - half) for dj in offsets)
+        return cells
+
+    def _band_rows(self, center: Tuple[int, int], limit_km: float) -> List[int]:
+        """Occupied latitude rows that can hold a point within limit_km"""
+        if limit_km == math.inf:
+            return list(self._rows)
+        reach = int(math.ceil(limit_km / (EARTH_RADIUS_KM * math.radians(self.cell_degrees)))) + 1
+        return [row for row in range(center[0] - reach, center[0] + reach + 1) if row in self._rows]
+
+    def _band(self, rows: List[int]) -> List[Hashable]:
+        """Keys in the given latitude rows"""
+        return [key for row in rows for cell in self._rows[row] for key in self._cells[cell]]
+
+    def _band_is_cheaper(self, rows: List[int], radius: int) -> bool:
+        """Whether scanning the band visits fewer cells than the next ring"""
+        # Near the poles the rings gain little distance per step, while the
+        # band of reachable rows holds only a few occupied cells
+        return sum(len(self._rows[row]) for row in rows) <= 8 * (radius + 1)
+
+    def _ring_lower_bound_km(self, lat: float, radius: int) -> float:
+        """Minimum distance to any point outside rings 0..radius"""
+        span = math.radians(radius * self.cell_degrees)
+        edge_lat = math.radians(min(90.0, abs(lat) + radius * self.cell_degrees))
+        # Closer of: moving span degrees in latitude, or span degrees of
+        # longitude along the poleward edge (a great circle, not the parallel)
+        lon_bound = 2 * math.asin(min(1.0, math.cos(edge_lat) * math.sin(min(span, math.pi) / 2)))
+        return EARTH_RADIUS_KM * min(span, lon_bound)
+
+    def nearest(self, lat: float, lon: float, max_km: float = None,
+                max_age: float = None) -> Optional[Tuple[Any, float]]:
+        """
+        Find the closest point
+
+        Args:
+            lat (float): Query latitude
+            lon (float): Query longitude
+            max_km (float): Ignore points further than this distance
+            max_age (float): Ignore points older than this many seconds
+
+        Returns:
+            Tuple of (value, distance_km), or None if nothing qualifies
+
+        Without max_km, a query far from every point ends up checking all of
+        them; pass max_km on hot paths.
+        """
+        cutoff = time.time() - max_age if max_age is not None else None
+        best: Optional[Tuple[Any, float]] = None
+
+        with self._lock:
+            if not self._points:
+                return None
+
+            center = self._cell(lat, lon)
+            radius = 0
+            while True:
+                # Once the reachable latitude band is bounded and small, or
+                # scanning every ring would visit more cells than exist,
+                # check the band directly instead
+                limit = min(best[1] if best else math.inf, max_km if max_km is not None else math.inf)
+                rows = self._band_rows(center, limit) if limit < math.inf else None
+                if (2 * radius + 1) ** 2 > len(self._cells) or (rows is not None and self._band_is_cheaper(rows, radius)):
+                    candidates = self._band(rows if rows is not None else self._band_rows(center, limit))
+                    radius = None
+                else:
+                    candidates = [key for cell in self._ring(center, radius) for key in self._cells.get(cell, ())]
+
+                for key in candidates:
+                    _, plat, plon, value, timestamp = self._points[key]
+                    if cutoff is not None and timestamp < cutoff:
+                        continue
+                    distance = haversine_km(lat, lon, plat, plon)
+                    if max_km is not None and distance > max_km:
+                        continue
+                    if best is None or distance < best[1]:
+                        best = (value, distance)
+
+                if radius is None:
+                    return best
+
+                bound = self._ring_lower_bound_km(lat, radius)
+                if best is not None and best[1] <= bound:
+                    return best
+                if max_km is not None and bound > max_km:
+                    return best
+                radius += 1
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Any, float]]:
+        """Return (value, distance_km) for all points within radius_km, closest first"""
+        results: Dict[Hashable, Tuple[Any, float]] = {}
+        with self._lock:
+            center = self._cell(lat, lon)
+            rows = self._band_rows(center, radius_km)
+            radius = 0
+            while True:
+                if (2 * radius + 1) ** 2 > len(self._cells) or self._band_is_cheaper(rows, radius):
+                    candidates = self._band(rows)
+                    done = True
+                else:
+                    candidates = [key for cell in self._ring(center, radius) for key in self._cells.get(cell, ())]
+                    done = False
+
+                for key in candidates:
+                    _, plat, plon, value, _ = self._points[key]
+                    distance = haversine_km(lat, lon, plat, plon)
+                    if distance <= radius_km:
+                        results[key] = (value, distance)
+
+                if done:
+                    break
+                if self._ring_lower_bound_km(lat, radius) > radius_km:
+                    break
+                radius += 1
+
+        return sorted(results.values(), key=lambda item: item[1])
+
+# Geohash cells, used to key map tiles
+
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+def geohash_encode(lat: float, lon: float, precision: int) -> str:
+    """Encode coordinates as a geohash of the given length"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+
+    return ''.join(chars)
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """Return (south, west, north, east) of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+def geohash_center(geohash: str) -> Tuple[float, float]:
+    """Return the (lat, lon) center of a geohash cell"""
+    south, west, north, east = geohash_bounds(geohash)
+    return (south + north) / 2, (west + east) / 2
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """Return (lat_degrees, lon_degrees) spanned by a cell of this precision"""
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+def geohash_cover(south: float, west: float, north: float, east: float, precision: int) -> List[str]:
+    """List the geohash cells of a precision that cover a bounding box"""
+    lat_step, lon_step = geohash_cell_size(precision)
+    south, north = max(-90.0, south), min(90.0, north)
+    west, east = max(-180.0, west), min(180.0, east)
+
+    cells = []
+    lat = math.floor((south + 90.0) / lat_step) * lat_step - 90.0
+    while lat < north:
+        lon = math.floor((west + 180.0) / lon_step) * lon_step - 180.0
+        while lon < east:
+            cells.append(geohash_encode(lat + lat_step / 2, lon + lon_step / 2, precision))
+            lon += lon_step
+        lat += lat_step
+    return cells
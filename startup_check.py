@@ -0,0 +1,84 @@
+# startup_check.py
+import ast
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+from config import Config
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# "import time:  self [us] | cumulative | imported package" (name indented by depth)
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)$")
+
+def startup_imports(path: str = APP_PATH) -> List[str]:
+    """Top-level modules imported at module level of a script"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            if name not in modules:
+                modules.append(name)
+    return modules
+
+def measure_imports(modules: List[str]) -> Tuple[Dict[str, float], List[str]]:
+    """
+    Import modules in a fresh interpreter and time them
+
+    Returns:
+        Tuple of (cumulative milliseconds per requested module, every module
+        the imports loaded)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=os.path.dirname(APP_PATH), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app dependencies failed:\n{result.stderr[-2000:]}")
+
+    costs: Dict[str, float] = {}
+    loaded: List[str] = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        loaded.append(name)
+        # Depth 0 entries are the requested modules (and interpreter startup);
+        # modules already loaded by an earlier import don't appear at all
+        if len(indent) == 1 and name in modules:
+            costs[name] = int(cumulative) / 1000
+    return costs, loaded
+
+def main() -> int:
+    """Report per-module import cost of app.py and check it against the budget"""
+    modules = startup_imports()
+    costs, loaded = measure_imports(modules)
+
+    print(f"{'module':<24}{'import ms':>12}")
+    for name in sorted(costs, key=costs.get, reverse=True):
+        print(f"{name:<24}{costs[name]:>12.1f}")
+    total = sum(costs.values())
+    print(f"{'total':<24}{total:>12.1f}  (budget {Config.STARTUP_IMPORT_BUDGET_MS} ms)")
+
+    failed = False
+    eager = [name for name in Config.STARTUP_LAZY_MODULES if name in loaded]
+    if eager:
+        print(f"Loaded at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total > Config.STARTUP_IMPORT_BUDGET_MS:
+        print(f"Startup imports exceed the budget by {total - Config.STARTUP_IMPORT_BUDGET_MS:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# templates.py
+from functools import lru_cache
+from string import Template
+from typing import Tuple
+from config import Config
+
+# Card markup rendered with st.markdown. Styling lives in the classes
+# defined by load_css() so each fragment only carries its data.
+TEMPLATES = {
+    'section_heading': '<div class="section-heading"><$tag>$text</$tag></div>',
+    'status_card': (
+        '<div class="$kind-card"><div class="status-row">'
+        '<span class="status-icon">$icon</span><span>$message</span>'
+        '</div></div>'
+    ),
+    'weather_card': (
+        '<div class="weather-card"><h2 class="card-title">$icon $city, $country</h2>'
+        '<div class="hero-row"><div class="hero-temp">$temp</div>'
+        '<div><p class="hero-condition">$condition</p><p class="hero-feels">Feels like $feels_like</p></div>'
+        '</div></div>'
+    ),
+    'metric_tile': (
+        '<div class="metric-container"><div class="metric-label">$label</div>'
+        '<div class="metric-value">$value</div>$delta</div>'
+    ),
+    'metric_delta': '<div class="metric-delta">$delta</div>',
+    'detail_heading': '<div class="detail-heading"><h4>$text</h4></div>',
+    'sun_tile': (
+        '<div class="metric-container centered"><div class="sun-icon">$icon</div>'
+        '<div class="sun-label">$label</div><div class="sun-time">$time</div></div>'
+    ),
+    'forecast_day': (
+        '<div class="forecast-card day-card"><div class="day-grid">'
+        '<div class="day-info"><div class="day-name">$day_name</div>'
+        '<div class="day-condition"><span class="day-icon">$icon</span><span>$condition</span></div></div>'
+        '<div><div class="mini-label">🌡️ Temp Range</div><div class="mini-value">$max_temp°/$min_temp°</div></div>'
+        '<div><div class="mini-label">💧 Humidity</div><div class="mini-value">$humidity%</div></div>'
+        '<div><div class="mini-label">🌪️ Wind</div><div class="mini-value">$wind $speed_unit</div></div>'
+        '<div><div class="temp-badge" style="background: $temp_color;">$max_temp°</div></div>'
+        '</div></div>'
+    ),
+    'comparison_card': (
+        '<div class="weather-card compare-card"><h3>$city, $country</h3>'
+        '<div class="compare-body"><div class="compare-icon">$icon</div>'
+        '<div class="compare-temp">$temp</div><p class="compare-condition">$condition</p>'
+        '</div></div>'
+    ),
+    'comparison_metric': (
+        '<div class="metric-container compare-metric"><div class="compare-label">$label</div>'
+        '<div class="compare-value">$value</div>$delta</div>'
+    ),
+    'comparison_delta': '<div class="compare-delta" style="color: $color;">$delta</div>',
+    'aqi_card': (
+        '<div class="metric-container aqi-card"><div class="metric-label">🌫️ Air Quality</div>'
+        '<div class="aqi-badge" style="background: $color;">$index · $label</div>'
+        '<div class="aqi-components">$components</div></div>'
+    ),
+    'aqi_component': '<span class="aqi-component"><strong>$name</strong> $value μg/m³</span>',
+    'history_entry': (
+        '<div class="history-entry"><div class="history-city">$status $city</div>'
+        '<div class="history-time">🕒 $timestamp</div></div>'
+    ),
+    'history_empty': '<div class="history-empty">No recent searches</div>',
+}
+
+# Compiled once at import
+_COMPILED = {name: Template(source) for name, source in TEMPLATES.items()}
+
+STATUS_ICONS = {'success': "✅", 'error': "❌"}
+
+@lru_cache(maxsize=Config.TEMPLATE_CACHE_SIZE)
+def _render(name: str, values: Tuple[Tuple[str, str], ...]) -> str:
+    """Substitute values into a compiled template (memoized by input)"""
+    return _COMPILED[name].substitute(dict(values))
+
+def render(name: str, /, **values) -> str:
+    """Render a named card template"""
+    return _render(name, tuple(sorted((key, str(value)) for key, value in values.items())))
+
+def section_heading(text: str, level: int = 2) -> str:
+    """Render a centered section heading"""
+    return render('section_heading', tag=f"h{level}", text=text)
+
+def status_card(kind: str, message: str) -> str:
+    """Render a success or error card with its icon"""
+    return render('status_card', kind=kind, icon=STATUS_ICONS[kind], message=message)
+
+def template_cache_info():
+    """Return hit/miss statistics of the fragment cache"""
+    return _render.cache_info()
@@ -0,0 +1,150 @@
+# conftest.py
+import fnmatch
+import json
+import os
+import sys
+import threading
+import time
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from cache import MemoryBackend
+from weather_app_API import WeatherAPI
+
+def weather_payload(location_id: int, name: str) -> dict:
+    """Minimal current weather body as OpenWeatherMap returns it"""
+    return {
+        'id': location_id,
+        'name': name,
+        'coord': {'lat': 51.5, 'lon': -0.1},
+        'weather': [{'id': 800, 'main': 'Clear', 'description': 'clear sky', 'icon': '01d'}],
+        'main': {'temp': 15.0, 'feels_like': 14.0, 'temp_min': 13.0, 'temp_max': 17.0,
+                 'pressure': 1012, 'humidity': 70},
+        'wind': {'speed': 3.6, 'deg': 200},
+        'clouds': {'all': 0},
+        'sys': {'country': 'GB'},
+        'dt': int(time.time()),
+        'cod': 200
+    }
+
+def forecast_payload(location_id: int, name: str) -> dict:
+    """Minimal 5-day forecast body"""
+    return {
+        'cod': '200',
+        'cnt': 40,
+        'list': [{
+            'dt': 1700000000 + i * 10800,
+            'main': {'temp': 10.0 + i % 8, 'feels_like': 9.0, 'temp_min': 8.0, 'temp_max': 12.0,
+                     'pressure': 1010, 'humidity': 60},
+            'weather': [{'main': 'Clear', 'description': 'clear sky', 'icon': '01d'}],
+            'wind': {'speed': 4.0, 'deg': 180}
+        } for i in range(40)],
+        'city': {'id': location_id, 'name': name, 'coord': {'lat': 51.5, 'lon': -0.1}, 'country': 'GB'}
+    }
+
+class FakeUpstream:
+    """Stands in for OpenWeatherMap at the HTTP layer, with a fixed latency"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.responses = {}  # endpoint -> list of (status, headers) to answer with next
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def _location(self, params: dict):
+        with self._lock:
+            if 'id' in params:
+                name = next(name for name, location_id in self._ids.items() if location_id == params['id'])
+            else:
+                name = str(params.get('q', 'coordinates')).split(',')[0].title()
+            location_id = self._ids.setdefault(name, 1000 + len(self._ids))
+        return location_id, name
+
+    def body(self, endpoint: str, params: dict):
+        if endpoint == 'weather':
+            return weather_payload(*self._location(params))
+        if endpoint == 'forecast':
+            return forecast_payload(*self._location(params))
+        if endpoint == 'air_pollution':
+            return {'list': [{'main': {'aqi': 2}, 'components': {'pm2_5': 5.0}, 'dt': 1700000000}]}
+        if endpoint == 'direct':
+            return [{'name': str(params['q']).title(), 'lat': 51.5, 'lon': -0.1, 'country': 'GB'}]
+        raise AssertionError(f"Unexpected endpoint {endpoint}")
+
+    def __call__(self, api, endpoint, url, params, headers, timeout) -> requests.Response:
+        with self._lock:
+            self.calls.append((endpoint, dict(params), dict(headers)))
+            queued = self.responses.get(endpoint)
+            status, extra_headers = queued.pop(0) if queued else (200, {})
+        if self.delay:
+            time.sleep(self.delay)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(extra_headers)
+        response._content = b'' if status == 304 else json.dumps(self.body(endpoint, params)).encode('utf-8')
+        response.url = url
+        return response
+
+class FakeRedis:
+    """
+    In-process stand-in for a Redis client (get, set with ex, delete, scan_iter, ping)
+
+    Keys expire by time.time(), so tests can move the clock. Setting
+    failing makes every call raise, like a server that went away.
+    """
+
+    def __init__(self):
+        self.data = {}  # key -> (value, expires_at)
+        self.failing = False
+
+    def _check(self):
+        if self.failing:
+            raise ConnectionError("Connection refused")
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            return None
+        return entry
+
+    def ping(self):
+        self._check()
+        return True
+
+    def get(self, key):
+        self._check()
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = (bytes(value), time.time() + ex if ex else None)
+        return True
+
+    def delete(self, *keys):
+        self._check()
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match='*'):
+        self._check()
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match) and self._live(key):
+                yield key
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Patch every WeatherAPI HTTP call through a FakeUpstream"""
+    fake = FakeUpstream()
+    monkeypatch.setattr(WeatherAPI, '_timed_get', lambda self, *args: fake(self, *args))
+    return fake
+
+@pytest.fixture
+def api(upstream, monkeypatch):
+    """WeatherAPI on a private in-memory cache, without history or snapshots"""
+    monkeypatch.setattr(Config, 'HISTORY_ENABLED', False)
+    return WeatherAPI(cache_backend=MemoryBackend())
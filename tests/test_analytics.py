@@ -0,0 +1,71 @@
+# test_analytics.py
+import random
+from collections import Counter
+from analytics import SearchAnalytics, SpaceSaving
+
+def scan_space_saving(stream, capacity):
+    """Reference Space-Saving that finds the smallest count by scanning"""
+    counters = {}
+    for key in stream:
+        if key in counters:
+            counters[key][0] += 1
+        elif len(counters) < capacity:
+            counters[key] = [1, 0]
+        else:
+            victim = min(counters, key=lambda k: counters[k][0])
+            stale = counters.pop(victim)[0]
+            counters[key] = [stale + 1, stale]
+    return counters
+
+def zipf_stream(rng, n, keys):
+    weights = [1 / (rank + 1) for rank in range(keys)]
+    return rng.choices(range(keys), weights, k=n)
+
+def test_heap_eviction_keeps_space_saving_guarantees():
+    rng = random.Random(0)
+    stream = zipf_stream(rng, 20000, 500)
+    capacity = 50
+    counter = SpaceSaving(capacity)
+    for key in stream:
+        counter.offer(key)
+    counts = counter.counts()
+    exact = Counter(stream)
+    reference = scan_space_saving(stream, capacity)
+
+    assert len(counts) == capacity == len(counter._heap)
+    assert counter.total == len(stream)
+    # Ties may pick a different victim, but the count distribution is the same
+    assert sorted(count for count, _ in counts.values()) == sorted(count for count, _ in reference.values())
+    for key, (count, overcount) in counts.items():
+        assert count - overcount <= exact[key] <= count
+    for key, frequency in exact.items():
+        if frequency > len(stream) / capacity:
+            assert key in counts
+
+def test_hot_cities_ranks_by_location():
+    analytics = SearchAnalytics(bucket_seconds=60, window_buckets=2, capacity=10)
+    for _ in range(3):
+        analytics.record(2643743, "London, GB")
+    analytics.record(2988507, "Paris, FR")
+
+    assert analytics.hot_cities(5) == [(2643743, "London, GB", 3), (2988507, "Paris, FR", 1)]
+    assert analytics.stats()['searches'] == 4
+
+def test_spellings_share_one_location(api, upstream):
+    for spelling in ("London", "london", "  LONDON "):
+        api.get_weather(spelling, log_search=False)
+
+    assert api.analytics.hot_cities() == [(1000, "London, GB", 3)]
+
+def test_bundle_records_one_search(api, upstream):
+    bundle = api.get_city_bundle("Paris", include_air_quality=False)
+    api.get_forecast("Paris")
+
+    assert bundle['forecast'] is not None
+    assert api.analytics.hot_cities() == [(1000, "Paris, GB", 2)]
+
+def test_batch_records_each_city_once(api, upstream):
+    api.get_multiple_cities_weather(["Paris", "Tokyo", "Paris"], log_search=False)
+    api.get_weather_by_coordinates(51.5, -0.1)
+
+    assert sorted(api.analytics.hot_cities()) == [(1000, "Paris, GB", 1), (1001, "Tokyo, GB", 1)]
@@ -0,0 +1,97 @@
+# test_api_server.py
+import asyncio
+import time
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer
+import api_server
+from config import Config
+
+def run(api, scenario):
+    async def main():
+        async with TestClient(TestServer(api_server.create_app(api))) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+def test_weather_revalidates_with_etag(api, upstream):
+    async def scenario(client):
+        first = await client.get("/v1/weather", params={"city": "London"})
+        body = await first.json()
+        second = await client.get("/v1/weather", params={"city": "london"},
+                                  headers={"If-None-Match": first.headers["ETag"]})
+        return first.status, body, second.status
+
+    status, body, revalidated = run(api, scenario)
+    assert status == 200 and body['name'] == "London"
+    assert revalidated == 304
+    assert len(upstream.calls) == 1
+
+def test_batch_reports_each_city(api, upstream):
+    async def scenario(client):
+        response = await client.post("/v1/batch", json={"cities": ["Paris", "Tokyo", "Paris"]})
+        return response.status, await response.json()
+
+    status, body = run(api, scenario)
+    assert status == 200
+    assert sorted(body['successful']) == ["Paris", "Tokyo"]
+    assert body['total_requested'] == body['successful_count'] == 2
+
+def test_single_city_not_delayed_by_running_batch(api, upstream):
+    upstream.delay = 0.1
+
+    async def scenario(client):
+        batch = asyncio.ensure_future(
+            client.post("/v1/batch", json={"cities": [f"Batch City {i}" for i in range(50)]})
+        )
+        # Let the batch start and fill its slots
+        await asyncio.sleep(0.05)
+        start = time.monotonic()
+        response = await client.get("/v1/weather", params={"city": "Interactive"})
+        elapsed = time.monotonic() - start
+        running = not batch.done()
+        batch_response = await batch
+        return response.status, elapsed, running, batch_response.status
+
+    status, elapsed, running, batch_status = run(api, scenario)
+    assert status == 200 and batch_status == 200
+    assert elapsed < 0.5
+    assert running, "batch finished before the single-city call was measured"
+
+def test_health_does_not_block_the_event_loop(api, upstream, monkeypatch):
+    cache_stats = api.cache_stats
+
+    def slow_cache_stats():
+        # Like sizing a large Redis keyspace
+        time.sleep(0.5)
+        return cache_stats()
+    monkeypatch.setattr(api, 'cache_stats', slow_cache_stats)
+
+    async def scenario(client):
+        health = asyncio.ensure_future(client.get("/health"))
+        await asyncio.sleep(0.05)
+        start = time.monotonic()
+        response = await client.get("/v1/weather", params={"city": "London"})
+        elapsed = time.monotonic() - start
+        health_response = await health
+        return response.status, elapsed, health_response.status, await health_response.json()
+
+    status, elapsed, health_status, body = run(api, scenario)
+    assert status == 200 and health_status == 200
+    assert elapsed < 0.3
+    assert body['cache']['backend'] == "memory"
+
+@pytest.mark.parametrize("path, params, endpoint", [
+    ("/v1/aqi", {"lat": "51.5", "lon": "-0.1"}, "air_pollution"),
+    ("/v1/search", {"q": "London"}, "direct"),
+])
+@pytest.mark.parametrize("upstream_status, status", [(404, 404), (429, 503), (500, 502)])
+def test_upstream_errors_keep_their_status(api, upstream, monkeypatch, path, params, endpoint, upstream_status, status):
+    monkeypatch.setattr(Config, 'MAX_RETRIES', 0)
+    upstream.responses[endpoint] = [(upstream_status, {})]
+
+    async def scenario(client):
+        response = await client.get(path, params=params)
+        return response.status
+
+    assert run(api, scenario) == status
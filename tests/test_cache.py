@@ -0,0 +1,166 @@
+# test_cache.py
+import time
+import pytest
+import cache
+from cache import CacheSnapshotter, MemoryBackend, RedisBackend, SQLiteBackend
+from weather_app_API import WeatherAPI
+from conftest import FakeRedis, forecast_payload, weather_payload
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteBackend(str(tmp_path / "cache.db"))
+    return RedisBackend(client=FakeRedis(), prefix="test:")
+
+def later(monkeypatch, seconds):
+    """Move time.time() forward for the cache and the fake server"""
+    now = time.time()
+    monkeypatch.setattr(cache.time, 'time', lambda: now + seconds)
+
+def test_round_trip(backend):
+    weather = weather_payload(1, "London")
+    forecast = forecast_payload(1, "London")
+    backend.set('weather:1', weather, 60)
+    backend.set('forecast:1', forecast, 60)
+    backend.set('coords', [51.5, -0.1], 60)
+
+    assert backend.get('weather:1') == weather
+    assert backend.get('forecast:1') == forecast
+    assert backend.get('coords') == [51.5, -0.1]
+    assert backend.get('missing') is None
+    assert backend.size() == 3
+
+    # Every read decodes a fresh copy
+    backend.get('weather:1')['name'] = "Changed"
+    assert backend.get('weather:1')['name'] == "London"
+
+    backend.delete('weather:1')
+    assert backend.get('weather:1') is None
+    backend.clear()
+    assert backend.size() == 0
+    assert backend.stats()['hits'] == 5 and backend.stats()['misses'] == 2
+
+def test_entries_expire(backend, monkeypatch):
+    backend.set('short', {'a': 1}, 30)
+    backend.set('long', {'b': 2}, 300)
+
+    later(monkeypatch, 60)
+    assert backend.get('short') is None
+    assert backend.get('long') == {'b': 2}
+
+def test_redis_clear_keeps_other_prefixes():
+    client = FakeRedis()
+    ours = RedisBackend(client=client, prefix="ours:")
+    theirs = RedisBackend(client=client, prefix="theirs:")
+    ours.set('key', 1, 60)
+    theirs.set('key', 2, 60)
+
+    ours.clear()
+    assert ours.get('key') is None and theirs.get('key') == 2
+
+def break_backend(backend):
+    if isinstance(backend, RedisBackend):
+        backend.client.failing = True
+    else:
+        backend._conn().execute("DROP TABLE cache")
+
+def test_unreachable_store_behaves_as_miss(backend):
+    backend.set('key', {'a': 1}, 60)
+    break_backend(backend)
+
+    assert backend.get('key') is None
+    backend.set('key', {'a': 2}, 60)
+    backend.delete('key')
+    backend.clear()
+    assert backend.size() is None
+    assert backend.stats()['size'] is None
+
+def test_redis_outage_does_not_fail_requests(upstream, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, 'HISTORY_ENABLED', False)
+    client = FakeRedis()
+    api = WeatherAPI(cache_backend=RedisBackend(client=client, prefix="test:"))
+    api.get_weather("London", log_search=False)
+
+    client.failing = True
+    assert api.get_weather("London", log_search=False)['name'] == "London"
+    assert len(upstream.calls) == 2
+
+def test_create_backend_falls_back_to_memory(monkeypatch):
+    def unreachable(*args, **kwargs):
+        backend = RedisBackend(client=FakeRedis())
+        backend.client.failing = True
+        return backend
+    monkeypatch.setitem(cache.CACHE_BACKENDS, 'redis', unreachable)
+    assert isinstance(cache.create_cache_backend('redis'), MemoryBackend)
+
+# Snapshots
+
+def test_snapshot_round_trip_drops_expired(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.snapshot")
+    weather = weather_payload(1, "London")
+    source = MemoryBackend()
+    source.set('weather:1', weather, 600)
+    source.set('forecast:1', forecast_payload(1, "London"), 60)
+    source.set('gone', {'a': 1}, 60)
+    source.delete('gone')
+    assert source.snapshot(path) == 2
+
+    restored = MemoryBackend()
+    assert restored.load_snapshot(path) == 2
+    assert restored.get('weather:1') == weather
+    assert restored.memory_bytes() == source.memory_bytes()
+
+    # Loaded later, entries past their original expiry are dropped
+    later(monkeypatch, 120)
+    assert MemoryBackend().load_snapshot(path) == 1
+
+def test_snapshot_skips_entries_already_expired(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.snapshot")
+    backend = MemoryBackend()
+    backend.set('short', 1, 30)
+    backend.set('long', 2, 300)
+    later(monkeypatch, 60)
+    assert backend.snapshot(path) == 1
+
+def write_snapshot(tmp_path):
+    path = str(tmp_path / "cache.snapshot")
+    backend = MemoryBackend()
+    for i in range(3):
+        backend.set(f'key:{i}', {'value': i}, 600)
+    backend.snapshot(path)
+    return path
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: b'NOTCACHE' + data[8:],
+    lambda data: data[:-3],
+    lambda data: data[:len(cache.SNAPSHOT_MAGIC) + 5],
+    lambda data: b'',
+])
+def test_corrupt_snapshot_is_rejected(tmp_path, corrupt):
+    path = write_snapshot(tmp_path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(corrupt(data))
+
+    backend = MemoryBackend()
+    backend.set('existing', 1, 60)
+    with pytest.raises(ValueError):
+        backend.load_snapshot(path)
+    assert backend.size() == 1
+
+def test_snapshotter_warm_starts_and_survives_corruption(tmp_path):
+    path = write_snapshot(tmp_path)
+    backend = MemoryBackend()
+    snapshotter = CacheSnapshotter(backend, path=path, interval=3600)
+    assert snapshotter.start() == 3
+    backend.set('key:3', {'value': 3}, 600)
+    snapshotter.stop()
+    assert MemoryBackend().load_snapshot(path) == 4
+
+    with open(path, 'r+b') as f:
+        f.write(b'garbage!')
+    cold = CacheSnapshotter(MemoryBackend(), path=path, interval=3600)
+    assert cold.start() == 0
+    cold.stop()
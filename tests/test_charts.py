@@ -0,0 +1,17 @@
+# test_charts.py
+import numpy as np
+import pytest
+
+pytest.importorskip("plotly")
+from charts import history_figure
+
+def test_history_figure_tracks_values():
+    timestamps = np.arange(1700000000, 1700000000 + 600 * 10, 600, dtype=np.int64)
+    first = history_figure("London", 7, timestamps, np.arange(10, dtype=np.float64), "Temperature", "°C", "metric")
+    # Same location, length and time span, different observations
+    second = history_figure("London", 7, timestamps, np.arange(10, dtype=np.float64) + 1, "Temperature", "°C", "metric")
+    again = history_figure("London", 7, timestamps.copy(), np.arange(10, dtype=np.float64), "Temperature", "°C", "metric")
+
+    assert second is not first
+    assert list(second.data[0].y) == list(range(1, 11))
+    assert again is first
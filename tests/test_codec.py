@@ -0,0 +1,62 @@
+# test_codec.py
+import json
+import pytest
+import codec
+from conftest import forecast_payload, weather_payload
+
+SMALL = {'id': 1, 'name': "Zürich", 'temps': [1.5, -2.25, None], 'ok': True}
+
+@pytest.fixture(params=['msgpack+zstd', 'json+zlib'])
+def codec_name(request, monkeypatch):
+    if request.param == 'msgpack+zstd':
+        if not codec.HAS_MSGPACK_ZSTD:
+            pytest.skip("msgpack/zstandard not installed")
+    else:
+        monkeypatch.setattr(codec, 'HAS_MSGPACK_ZSTD', False)
+    return request.param
+
+@pytest.mark.parametrize("value", [
+    SMALL,
+    weather_payload(2643743, "London"),
+    forecast_payload(2643743, "London"),
+    [51.5, -0.1],
+    [],
+    "plain",
+])
+def test_round_trip(codec_name, value):
+    assert codec.codec_name() == codec_name
+    assert codec.decode(codec.encode(value)) == value
+
+def test_format_byte_marks_compression(codec_name):
+    small, large = codec.encode(SMALL), codec.encode(forecast_payload(1, "London"))
+    if codec_name == 'msgpack+zstd':
+        assert (small[0], large[0]) == (codec.FORMAT_MSGPACK, codec.FORMAT_MSGPACK_ZSTD)
+    else:
+        assert (small[0], large[0]) == (codec.FORMAT_JSON, codec.FORMAT_JSON_ZLIB)
+    # Forecast points repeat their keys, so compression pays off
+    assert len(large) < len(json.dumps(forecast_payload(1, "London"))) / 4
+
+def test_fallback_entries_stay_readable(monkeypatch):
+    # Entries written without msgpack stay readable once it is installed
+    value = forecast_payload(1, "London")
+    installed = codec.HAS_MSGPACK_ZSTD
+    monkeypatch.setattr(codec, 'HAS_MSGPACK_ZSTD', False)
+    encoded = codec.encode(value)
+    monkeypatch.setattr(codec, 'HAS_MSGPACK_ZSTD', installed)
+    assert codec.decode(encoded) == value
+
+def test_msgpack_entry_without_msgpack_is_rejected(monkeypatch):
+    if not codec.HAS_MSGPACK_ZSTD:
+        pytest.skip("msgpack/zstandard not installed")
+    encoded = codec.encode(SMALL)
+    monkeypatch.setattr(codec, 'HAS_MSGPACK_ZSTD', False)
+    with pytest.raises(ValueError):
+        codec.decode(encoded)
+
+def test_legacy_bare_json_is_read():
+    assert codec.decode(json.dumps(SMALL).encode('utf-8')) == SMALL
+
+@pytest.mark.parametrize("data", [b'', b'\x00abc', b'\x07' + json.dumps(SMALL).encode('utf-8'), b'\xff\xfe'])
+def test_unknown_format_is_rejected(data):
+    with pytest.raises(ValueError):
+        codec.decode(data)
@@ -0,0 +1,66 @@
+# test_data_export.py
+import io
+import pytest
+
+pd = pytest.importorskip("pandas")
+from data_export import BATCH_EXPORT_DTYPES, EXPORT_MIME_TYPES, available_export_formats, export_batch_results
+from conftest import weather_payload
+
+@pytest.fixture(params=list(EXPORT_MIME_TYPES))
+def fmt(request):
+    if request.param not in available_export_formats():
+        pytest.skip(f"{request.param} export needs an optional dependency")
+    return request.param
+
+def batch(count):
+    return {'successful': {f"City {i}": weather_payload(i, f"City {i}") for i in range(count)}}
+
+def read_back(data, fmt):
+    """Exported bytes as a frame, plus the number of chunks written"""
+    if fmt == 'csv':
+        return pd.read_csv(io.BytesIO(data)), None
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if fmt == 'parquet':
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        return parquet.read().to_pandas(), parquet.num_row_groups
+    reader = pa.ipc.open_file(io.BytesIO(data))
+    return reader.read_pandas(), reader.num_record_batches
+
+def test_chunked_export(fmt):
+    data = export_batch_results(batch(1203), fmt, chunk_size=500)
+    df, chunks = read_back(data, fmt)
+
+    assert list(df.columns) == list(BATCH_EXPORT_DTYPES)
+    assert len(df) == 1203
+    assert df['city_searched'].tolist() == [f"City {i}" for i in range(1203)]
+    assert df['city_id'].tolist() == list(range(1203))
+    assert (df['temperature'] == 15.0).all() and (df['weather_description'] == 'clear sky').all()
+    if chunks is not None:
+        assert chunks == 3
+
+def test_empty_export_keeps_columns(fmt):
+    df, _ = read_back(export_batch_results({'successful': {}}, fmt), fmt)
+
+    assert list(df.columns) == list(BATCH_EXPORT_DTYPES)
+    assert len(df) == 0
+
+def test_payload_without_weather(fmt):
+    results = batch(3)
+    del results['successful']["City 1"]['weather']
+    # A chunk where no payload has the field at all
+    data = export_batch_results(results, fmt, chunk_size=1)
+    df, _ = read_back(data, fmt)
+
+    assert len(df) == 3
+    assert df['weather_main'].isna().tolist() == [False, True, False]
+    assert df['weather_icon'][0] == '01d'
+    assert df['temperature'].tolist() == [15.0] * 3
+
+    # ...and one where it is missing from only some payloads
+    df, _ = read_back(export_batch_results(results, fmt, chunk_size=3), fmt)
+    assert df['weather_description'].isna().tolist() == [False, True, False]
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        export_batch_results(batch(1), 'xlsx')
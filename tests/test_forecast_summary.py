@@ -0,0 +1,79 @@
+# test_forecast_summary.py
+from datetime import datetime
+import pytest
+from forecast_summary import POINTS_PER_DAY, daily_summaries, hourly_series, slice_forecast
+from units import convert_forecast
+from conftest import forecast_payload
+
+def fetched(fingerprint, location_id=1):
+    data = forecast_payload(location_id, "London")
+    data['_metadata'] = {'fingerprint': fingerprint, 'units': 'metric'}
+    return data
+
+def test_slice_forecast_keeps_the_input():
+    data = fetched("slice")
+    first = slice_forecast(data, 2)
+
+    assert first['cnt'] == len(first['list']) == 2 * POINTS_PER_DAY
+    assert first['list'] == data['list'][:16]
+    assert first['_metadata'] == {'fingerprint': "slice", 'units': 'metric', 'days_requested': 2}
+    assert len(data['list']) == 40 and 'days_requested' not in data['_metadata']
+    assert len(slice_forecast(data, 7)['list']) == 40
+
+def test_hourly_series_values():
+    data = fetched("hourly")
+    series = hourly_series(data)
+
+    assert series['temp'].tolist() == [item['main']['temp'] for item in data['list']]
+    assert series['wind_speed'].tolist() == [4.0] * 40
+    assert series['pop'].tolist() == [0.0] * 40
+    assert series['time'][1] - series['time'][0] == 10800
+
+def test_daily_summaries_group_by_local_date():
+    data = fetched("daily")
+    days = {}
+    for item in data['list']:
+        days.setdefault(datetime.fromtimestamp(item['dt']).date(), []).append(item['main']['temp'])
+
+    summaries = daily_summaries(data)
+
+    assert [day['date'] for day in summaries] == sorted(days)
+    for day in summaries:
+        temps = days[day['date']]
+        assert (day['min_temp'], day['max_temp'], day['points']) == (min(temps), max(temps), len(temps))
+        assert day['condition'] == 'clear sky' and day['avg_humidity'] == 60.0
+
+def test_slices_are_summarized_separately():
+    data = fetched("slices")
+    full = daily_summaries(data)
+    first = daily_summaries(slice_forecast(data, 1))
+
+    assert sum(day['points'] for day in first) == POINTS_PER_DAY
+    assert sum(day['points'] for day in full) == 40
+    assert len(hourly_series(slice_forecast(data, 1))['temp']) == POINTS_PER_DAY
+    # The same slice of the same fetch is served from the memo
+    assert daily_summaries(slice_forecast(data, 1)) is first
+
+def test_new_dataset_version_invalidates():
+    data = fetched("before")
+    summaries = daily_summaries(data)
+    assert daily_summaries(fetched("before")) is summaries
+
+    changed = fetched("after")
+    for item in changed['list']:
+        item['main']['temp'] += 5
+    refreshed = daily_summaries(changed)
+
+    assert refreshed is not summaries
+    assert refreshed[0]['max_temp'] == summaries[0]['max_temp'] + 5
+    assert daily_summaries(fetched("before", location_id=2)) is not summaries
+
+def test_units_invalidate():
+    data = fetched("units")
+    metric = daily_summaries(data)
+    imperial = daily_summaries(convert_forecast(data, 'imperial'))
+
+    assert imperial is not metric
+    for celsius, fahrenheit in zip(metric, imperial):
+        assert fahrenheit['max_temp'] == pytest.approx(celsius['max_temp'] * 9 / 5 + 32)
+    assert hourly_series(convert_forecast(data, 'imperial'))['wind_speed'][0] == pytest.approx(8.95)
@@ -0,0 +1,210 @@
+# test_history_store.py
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import threading
+from contextlib import closing
+import numpy as np
+import pytest
+from history_store import (
+    FIELD_SCALES, MEASUREMENT_FIELDS, HistoryStore, decode_block, decode_varints, encode_block, encode_varints
+)
+from conftest import weather_payload
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def count_rows(db_path: str) -> int:
+    with closing(sqlite3.connect(db_path)) as conn:
+        recent = conn.execute("SELECT COUNT(*) FROM recent_observations").fetchone()[0]
+        packed = conn.execute("SELECT COALESCE(SUM(count), 0) FROM series_blocks").fetchone()[0]
+    return recent + packed
+
+def test_close_writes_queued_observations(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    store = HistoryStore(db_path, flush_interval=60)
+    store.record_weather(weather_payload(1, "London"))
+    store.close()
+    store.close()
+    assert count_rows(db_path) == 1
+
+def test_flush_after_close_returns(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), flush_interval=60)
+    store.close()
+    flusher = threading.Thread(target=store.flush, daemon=True)
+    flusher.start()
+    flusher.join(timeout=5)
+    assert not flusher.is_alive()
+
+def test_exit_writes_last_interval(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path[:0] = [{REPO!r}, {os.path.dirname(__file__)!r}]
+        from history_store import HistoryStore
+        from conftest import weather_payload
+        store = HistoryStore({db_path!r}, flush_interval=60)
+        store.record_weather(weather_payload(1, "London"))
+    """)
+    subprocess.run([sys.executable, "-c", script], cwd=REPO, check=True, timeout=60)
+    assert count_rows(db_path) == 1
+
+# Block codec
+
+INT64_MIN, INT64_MAX = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+@pytest.mark.parametrize("values", [
+    [],
+    [0],
+    [INT64_MIN],
+    [INT64_MAX],
+    [INT64_MIN, INT64_MAX, INT64_MIN, 0, INT64_MAX],
+    [INT64_MAX, -1, 1, INT64_MIN + 1, INT64_MAX - 1],
+    list(range(1700000000, 1700000000 + 600 * 300, 600)),
+])
+def test_varints_round_trip(values):
+    values = np.array(values, dtype=np.int64)
+    decoded = decode_varints(encode_varints(values))
+    assert decoded.dtype == np.int64
+    assert np.array_equal(decoded, values)
+
+def test_varints_round_trip_random():
+    rng = np.random.default_rng(0)
+    values = rng.integers(INT64_MIN, INT64_MAX, size=1000, dtype=np.int64, endpoint=True)
+    assert np.array_equal(decode_varints(encode_varints(values)), values)
+
+def test_small_deltas_stay_small():
+    ts = np.arange(1700000000, 1700000000 + 600 * 256, 600, dtype=np.int64)
+    # First value takes five bytes, every 600 s step two
+    assert len(encode_varints(ts)) == 5 + 2 * 255
+
+def test_block_round_trip_with_missing_values():
+    rows = [
+        (1700000000 + i * 600,) + tuple(
+            None if (i + j) % 5 == 0 else round(-40 + i * 0.37 + j, 2) for j in range(len(MEASUREMENT_FIELDS))
+        ) + ('clear sky', '01d')
+        for i in range(50)
+    ]
+    block = encode_block(rows)
+    decoded = decode_block(tuple(block[column] for column in ['ts'] + MEASUREMENT_FIELDS), MEASUREMENT_FIELDS)
+
+    assert decoded['ts'].tolist() == [row[0] for row in rows]
+    for j, field in enumerate(MEASUREMENT_FIELDS, start=1):
+        expected = np.array([np.nan if row[j] is None else row[j] for row in rows])
+        scale = FIELD_SCALES[field]
+        np.testing.assert_allclose(decoded[field], np.round(expected * scale) / scale, equal_nan=True)
+
+# Storage
+
+def record_series(store, count, first=0):
+    """Record observations first..first+count-1, ten minutes apart"""
+    for i in range(first, first + count):
+        data = weather_payload(7, "London")
+        data['dt'] = 1700000000 + i * 600
+        data['main']['temp'] = round(-10 + i * 0.25, 2)
+        data['_metadata'] = {'units': 'metric', 'fetch_time': float(data['dt'])}
+        store.record_weather(data)
+
+def test_compaction_keeps_every_row(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    store = HistoryStore(db_path, flush_interval=0.05, block_size=16)
+    count = 16 * 3 + 5
+    record_series(store, count)
+    store.flush()
+    # A second pass for a series that already has blocks
+    record_series(store, 20, first=count)
+    store.close()
+    total = count + 20
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        packed = conn.execute("SELECT COALESCE(SUM(count), 0) FROM series_blocks").fetchone()[0]
+    assert packed >= 48
+    assert count_rows(db_path) == total
+
+    arrays = HistoryStore(db_path).query_arrays(7, units='metric')
+    assert arrays['ts'].tolist() == [1700000000 + i * 600 for i in range(total)]
+    np.testing.assert_allclose(arrays['temp'], [round(-10 + i * 0.25, 2) for i in range(total)])
+    assert np.isnan(arrays['clouds']).sum() == 0
+
+def test_block_with_same_start_is_merged(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    store = HistoryStore(db_path, flush_interval=0.05, block_size=4)
+    record_series(store, 4)
+    store.flush()
+    # The first observation is refetched with new values after its block
+    # was packed, so the next block starts at the same timestamp
+    refetched = weather_payload(7, "London")
+    refetched['dt'] = 1700000000
+    refetched['main']['temp'] = 30.0
+    refetched['_metadata'] = {'units': 'metric', 'fetch_time': 1700009000.0}
+    store.record_weather(refetched)
+    record_series(store, 3, first=4)
+    store.close()
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        blocks = conn.execute("SELECT start_ts, end_ts, count FROM series_blocks").fetchall()
+    assert blocks == [(1700000000, 1700000000 + 6 * 600, 7)]
+
+    arrays = HistoryStore(db_path).query_arrays(7, units='metric')
+    assert arrays['ts'].tolist() == [1700000000 + i * 600 for i in range(7)]
+    np.testing.assert_allclose(arrays['temp'], [30.0] + [round(-10 + i * 0.25, 2) for i in range(1, 7)])
+
+def test_query_series_converts_and_downsamples(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), flush_interval=0.05, block_size=16)
+    record_series(store, 100)
+    store.close()
+
+    ts, values = store.query_series(7, 'temp', units='imperial', max_points=10)
+    assert len(ts) == len(values) == 10
+    assert ts[0] == 1700000000 and ts[-1] == 1700000000 + 99 * 600
+    assert values[0] == pytest.approx(-10 * 9 / 5 + 32)
+
+def test_migrates_single_table_layout(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    with closing(sqlite3.connect(db_path)) as conn, conn:
+        conn.executescript(LEGACY_SCHEMA)
+        conn.executemany(
+            "INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(7, 'London', 'GB', 51.5, -0.1, 'current', 1700000000 + i * 600, 'metric',
+              10.0 + i, 9.0, 8.0, 12.0, 1012, 70, 3.6, 200, 0, 'clear sky', '01d', 1700000000.0 + i)
+             for i in range(30)]
+        )
+
+    store = HistoryStore(db_path, block_size=16)
+    store.close()
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert 'observations' not in tables
+    assert store.find_location(city="london") == 7
+    assert store.locations()[0]['count'] == 30
+    arrays = store.query_arrays(7, units='metric')
+    assert arrays['temp'].tolist() == [10.0 + i for i in range(30)]
+
+# Layout written before locations and series blocks were split out
+LEGACY_SCHEMA = """
+CREATE TABLE observations (
+    location_id INTEGER NOT NULL,
+    name TEXT,
+    country TEXT,
+    lat REAL,
+    lon REAL,
+    kind TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    units TEXT NOT NULL,
+    temp REAL,
+    feels_like REAL,
+    temp_min REAL,
+    temp_max REAL,
+    pressure REAL,
+    humidity REAL,
+    wind_speed REAL,
+    wind_deg REAL,
+    clouds REAL,
+    condition TEXT,
+    icon TEXT,
+    fetch_time REAL,
+    PRIMARY KEY (location_id, kind, units, ts)
+);
+"""
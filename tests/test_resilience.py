@@ -0,0 +1,99 @@
+# test_resilience.py
+import threading
+import time
+from email.utils import formatdate
+import pytest
+from config import Config
+from resilience import LatencyTracker, RetryBudget, backoff_delay, parse_retry_after
+from weather_app_API import WeatherAPI
+
+def test_retry_budget_exhausts_and_refills():
+    budget = RetryBudget(ratio=0.5, capacity=2)
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+
+    budget.record_request()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert budget.try_spend()
+    assert budget.stats() == {'tokens': 0, 'spent': 3, 'denied': 2}
+
+def test_retry_budget_caps_tokens():
+    budget = RetryBudget(ratio=1, capacity=2)
+    for _ in range(10):
+        budget.record_request()
+    assert budget.stats()['tokens'] == 2
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None), ("", None), ("120", 120.0), ("0", 0.0), ("-5", 0.0), ("1.5", 1.5), ("soon", None)
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+def test_parse_retry_after_http_date():
+    assert parse_retry_after(formatdate(time.time() + 60, usegmt=True)) == pytest.approx(60, abs=2)
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+
+def test_backoff_honors_retry_after_and_cap(monkeypatch):
+    monkeypatch.setattr(Config, 'RETRY_BACKOFF_BASE', 0.5)
+    monkeypatch.setattr(Config, 'RETRY_BACKOFF_MAX', 2.0)
+    assert all(0 <= backoff_delay(10) <= 2.0 for _ in range(100))
+    assert backoff_delay(0, retry_after=5.0) == 5.0
+
+def test_latency_percentiles_need_samples():
+    tracker = LatencyTracker(window=100)
+    for i in range(Config.LATENCY_MIN_SAMPLES - 1):
+        tracker.record('weather', 0.1)
+    assert tracker.hedge_delay('weather') is None
+    assert tracker.timeout('weather') == Config.REQUEST_TIMEOUT
+
+    for i in range(100):
+        tracker.record('weather', i / 100)
+    assert tracker.hedge_delay('weather') == pytest.approx(0.95)
+    assert tracker.timeout('weather') == max(Config.MIN_REQUEST_TIMEOUT, 0.99 * Config.TIMEOUT_MULTIPLIER)
+
+# Hedging
+
+@pytest.fixture
+def hedging(api, monkeypatch):
+    monkeypatch.setattr(Config, 'HEDGE_REQUESTS', True)
+    for _ in range(Config.LATENCY_MIN_SAMPLES):
+        api.latency.record('weather', 0.05)
+    return api
+
+def test_slow_first_attempt_is_hedged(hedging, upstream, monkeypatch):
+    delays = [1.0, 0.0]
+    timed_get = WeatherAPI._timed_get
+
+    def uneven(self, *args):
+        time.sleep(delays.pop(0))
+        return timed_get(self, *args)
+
+    monkeypatch.setattr(WeatherAPI, '_timed_get', uneven)
+    start = time.monotonic()
+    data = hedging.get_weather("London", log_search=False)
+
+    assert time.monotonic() - start < 0.5
+    assert data['name'] == "London"
+    assert len(upstream.calls) == 1  # the slow attempt is still sleeping
+    assert hedging.retry_budget.stats()['spent'] == 1
+
+def test_fast_first_attempt_is_not_hedged(hedging, upstream):
+    hedging.get_weather("London", log_search=False)
+    assert len(upstream.calls) == 1
+    assert hedging.retry_budget.stats()['spent'] == 0
+
+def test_hedging_does_not_cap_concurrency(hedging, upstream):
+    # Every request is slower than p95, so each would be hedged without budget
+    hedging.retry_budget = RetryBudget(ratio=0, capacity=0)
+    upstream.delay = 0.2
+    cities = [f"City {i}" for i in range(Config.CONNECTION_POOL_SIZE)]
+    threads = [threading.Thread(target=hedging.get_weather, args=(city, "metric", False)) for city in cities]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(upstream.calls) == len(cities)
+    assert time.monotonic() - start < 0.2 * 2
@@ -0,0 +1,62 @@
+# test_scheduler.py
+import threading
+import time
+from scheduler import RequestScheduler, priority
+
+def test_interactive_bundle_not_delayed_by_running_batch(api, upstream):
+    upstream.delay = 0.1
+    start = time.monotonic()
+    alone = api.get_city_bundle("Reference")
+    baseline = time.monotonic() - start
+
+    cities = [f"Batch City {i}" for i in range(40)]
+    batch = threading.Thread(target=api.get_multiple_cities_weather, args=(cities,))
+    batch.start()
+    try:
+        # Let the batch fill its slots and queue the rest
+        time.sleep(0.05)
+        start = time.monotonic()
+        bundle = api.get_city_bundle("Interactive")
+        elapsed = time.monotonic() - start
+        batch_running = batch.is_alive()
+    finally:
+        batch.join()
+
+    assert alone['weather']['name'] == "Reference"
+    assert bundle['weather']['name'] == "Interactive"
+    # Weather and forecast in parallel, then air quality: two round trips
+    assert elapsed < baseline + 0.3
+    assert batch_running, "batch finished before the interactive call was measured"
+
+def test_batch_threads_capped_at_class_limit(api, upstream):
+    upstream.delay = 0.05
+    api.get_multiple_cities_weather([f"City {i}" for i in range(12)])
+    names = {thread.name for thread in threading.enumerate() if thread.name.startswith("weather-batch")}
+    assert 0 < len(names) <= api.scheduler.limits['batch']
+
+def test_higher_class_admitted_first():
+    scheduler = RequestScheduler(limits={'interactive': 1, 'batch': 1, 'background': 1}, total=1)
+    order = []
+    release = threading.Event()
+
+    def hold():
+        with scheduler.slot('background'):
+            release.wait()
+
+    def queued(name):
+        with priority(name):
+            with scheduler.slot():
+                order.append(name)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    time.sleep(0.05)
+    waiters = [threading.Thread(target=queued, args=(name,)) for name in ('background', 'batch', 'interactive')]
+    for waiter in waiters:
+        waiter.start()
+        time.sleep(0.05)
+    release.set()
+    for thread in [holder] + waiters:
+        thread.join()
+
+    assert order == ['interactive', 'batch', 'background']
@@ -0,0 +1,150 @@
+# test_spatial.py
+import random
+import pytest
+from spatial import (
+    SpatialIndex, geohash_bounds, geohash_center, geohash_cover, geohash_encode, haversine_km
+)
+
+def build(points, cell_degrees=0.5):
+    index = SpatialIndex(cell_degrees=cell_degrees)
+    for i, (lat, lon) in enumerate(points):
+        index.insert(i, lat, lon, i)
+    return index
+
+def brute_nearest(points, lat, lon, max_km=None):
+    distances = [(haversine_km(lat, lon, plat, plon), i) for i, (plat, plon) in enumerate(points)]
+    distances = [item for item in distances if max_km is None or item[0] <= max_km]
+    return min(distances) if distances else None
+
+def brute_within(points, lat, lon, radius_km):
+    return sorted(i for i, (plat, plon) in enumerate(points) if haversine_km(lat, lon, plat, plon) <= radius_km)
+
+def scattered(rng, n, lat_range, lon_range):
+    return [(rng.uniform(*lat_range), rng.uniform(*lon_range)) for _ in range(n)]
+
+QUERIES = [
+    ("antimeridian east", 10.0, 179.95),
+    ("antimeridian west", -10.0, -179.95),
+    ("north pole", 89.9, 45.0),
+    ("south pole", -89.9, -120.0),
+    ("high latitude", 85.0, 179.9),
+    ("equator", 0.0, 0.0),
+]
+
+@pytest.mark.parametrize("cell_degrees", [0.05, 0.5])
+@pytest.mark.parametrize("name, lat, lon", QUERIES)
+def test_nearest_matches_brute_force(name, lat, lon, cell_degrees):
+    rng = random.Random(name)
+    points = scattered(rng, 2000, (-90, 90), (-180, 180))
+    # Dense cluster straddling the query point (and the antimeridian or pole)
+    points += scattered(rng, 300, (max(-90, lat - 2), min(90, lat + 2)), (lon - 2, lon + 2))
+    points = [(plat, (plon + 180) % 360 - 180) for plat, plon in points]
+    index = build(points, cell_degrees)
+
+    for max_km in (None, 50.0, 500.0):
+        expected = brute_nearest(points, lat, lon, max_km)
+        found = index.nearest(lat, lon, max_km=max_km)
+        if expected is None:
+            assert found is None
+        else:
+            assert found[1] == pytest.approx(expected[0])
+
+@pytest.mark.parametrize("name, lat, lon", QUERIES)
+@pytest.mark.parametrize("radius_km", [1.0, 150.0, 2000.0])
+def test_within_matches_brute_force(name, lat, lon, radius_km):
+    rng = random.Random(name)
+    points = scattered(rng, 2000, (-90, 90), (-180, 180))
+    points += [(plat, (plon + 180) % 360 - 180)
+               for plat, plon in scattered(rng, 300, (max(-90, lat - 3), min(90, lat + 3)), (lon - 3, lon + 3))]
+    index = build(points)
+
+    found = index.within(lat, lon, radius_km)
+    assert sorted(value for value, _ in found) == brute_within(points, lat, lon, radius_km)
+    assert [distance for _, distance in found] == sorted(distance for _, distance in found)
+
+def test_radius_boundary_is_inclusive():
+    index = SpatialIndex(cell_degrees=0.5)
+    index.insert('edge', 0.0, 1.0, 'edge')
+    distance = haversine_km(0.0, 0.0, 0.0, 1.0)
+
+    assert [value for value, _ in index.within(0.0, 0.0, distance)] == ['edge']
+    assert index.within(0.0, 0.0, distance - 1e-6) == []
+    assert index.nearest(0.0, 0.0, max_km=distance)[0] == 'edge'
+    assert index.nearest(0.0, 0.0, max_km=distance - 1e-6) is None
+
+def test_across_antimeridian_and_pole():
+    index = SpatialIndex(cell_degrees=0.5)
+    index.insert('east', 0.0, 179.9, 'east')
+    index.insert('far', 0.0, 170.0, 'far')
+    value, distance = index.nearest(0.0, -179.9)
+    assert value == 'east' and distance == pytest.approx(haversine_km(0.0, -179.9, 0.0, 179.9))
+
+    index.insert('pole', 89.95, 0.0, 'pole')
+    # The other side of the pole is ~11 km away, much closer than the same longitude band
+    value, distance = index.nearest(89.95, 180.0)
+    assert value == 'pole' and distance < 12
+
+def test_max_age_purges_on_insert():
+    index = SpatialIndex(cell_degrees=0.5, max_age=60)
+    index.insert('old', 1.0, 1.0, 'old', timestamp=0)
+    index.insert('new', 2.0, 2.0, 'new')
+    assert len(index) == 1
+    assert index.nearest(1.0, 1.0)[0] == 'new'
+    assert index.stats()['points'] == 1
+
+def test_maxsize_evicts_oldest():
+    index = SpatialIndex(cell_degrees=0.5, maxsize=2)
+    for key in ('a', 'b', 'c'):
+        index.insert(key, 0.0, 0.0, key)
+    assert sorted(value for value, _ in index.within(0.0, 0.0, 1.0)) == ['b', 'c']
+
+def test_observation_index_holds_cache_keys(api, upstream):
+    first = api.get_weather_by_coordinates(51.5, -0.1)
+    second = api.get_weather_by_coordinates(51.5001, -0.1001)
+    value, _ = api.observation_index.nearest(51.5, -0.1)
+
+    assert isinstance(value, str) and api.cache.get(value) is not None
+    assert second['name'] == first['name']
+    assert len(upstream.calls) == 1
+    assert api.cache_stats()['observation_index']['points'] == 1
+
+    # An evicted payload is refetched rather than served from the index
+    api.cache.delete(value)
+    api.get_weather_by_coordinates(51.5001, -0.1001)
+    assert len(upstream.calls) == 2
+
+@pytest.mark.parametrize("lat, lon", [(51.5074, -0.1278), (-33.8688, 151.2093), (89.99, 179.99), (-90.0, -180.0)])
+def test_geohash_round_trip(lat, lon):
+    for precision in (1, 4, 7):
+        geohash = geohash_encode(lat, lon, precision)
+        south, west, north, east = geohash_bounds(geohash)
+        assert south <= lat <= north and west <= lon <= east
+        assert geohash_encode(*geohash_center(geohash), precision) == geohash
+
+def test_geohash_known_value():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+def test_geohash_cover_contains_box():
+    south, west, north, east = 51.3, -0.5, 51.7, 0.3
+    cells = geohash_cover(south, west, north, east, 4)
+    assert len(cells) == len(set(cells))
+    rng = random.Random(0)
+    for _ in range(200):
+        lat, lon = rng.uniform(south, north), rng.uniform(west, east)
+        assert geohash_encode(lat, lon, 4) in cells
+
+def test_cache_hits_keep_observation_order(api, upstream, monkeypatch):
+    body = upstream.body
+
+    def spread(endpoint, params):
+        data = body(endpoint, params)
+        data['coord'] = {'lat': 51.5, 'lon': data['id'] - 1000.0}
+        return data
+    monkeypatch.setattr(upstream, 'body', spread)
+    api.get_weather("London", log_search=False)
+    api.get_weather("Paris", log_search=False)
+    order = list(api.observation_index._points)
+    api.get_weather("London", log_search=False)
+
+    assert len(upstream.calls) == 2 and len(order) == 2
+    assert list(api.observation_index._points) == order
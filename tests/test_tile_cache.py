@@ -0,0 +1,112 @@
+# test_tile_cache.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from config import Config
+from scheduler import current_priority
+from spatial import geohash_cover
+from tile_cache import WeatherTileCache
+from weather_app_API import WeatherAPI
+
+class CountingFetcher:
+    """Tile fetcher that records calls and can be held until released"""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def __call__(self, lat, lon, units):
+        with self._lock:
+            self.calls.append((lat, lon, units))
+        self.release.wait(5)
+        if lat > 60:
+            raise ValueError("no station")
+        return {'main': {'temp': lat}, '_metadata': {}}
+
+@pytest.fixture
+def tiles():
+    fetcher = CountingFetcher()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        yield WeatherTileCache(fetcher, executor), fetcher
+
+VIEW = (51.0, -0.9, 52.0, 0.7)
+
+def test_cached_tiles_are_not_refetched(tiles):
+    cache, fetcher = tiles
+    first = cache.get_region(*VIEW, precision=3)
+    second = cache.get_region(*VIEW, precision=3)
+
+    assert first['fetched'] == len(first['tiles']) == len(fetcher.calls) > 0
+    assert second['cached'] == len(second['tiles']) and second['fetched'] == 0
+    assert len(fetcher.calls) == first['fetched']
+
+    # Panning fetches only the newly exposed tiles
+    south, west, north, east = VIEW
+    panned = cache.get_region(south, west + 1.0, north, east + 1.0, precision=3)
+    assert panned['cached'] > 0
+    assert len(fetcher.calls) == len(set(fetcher.calls)) == first['fetched'] + panned['fetched']
+
+def test_concurrent_views_share_in_flight_fetches(tiles):
+    cache, fetcher = tiles
+    fetcher.release.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_region(*VIEW, precision=3)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while len(fetcher.calls) < len(geohash_cover(*VIEW, 3)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Give the other views time to find the fetches in flight
+    time.sleep(0.05)
+    fetcher.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(fetcher.calls) == len(geohash_cover(*VIEW, 3))
+    assert all(len(result['tiles']) == len(fetcher.calls) for result in results)
+
+def test_failed_tiles_are_reported_and_retried(tiles):
+    cache, fetcher = tiles
+    view = (59.0, 10.0, 62.0, 12.0)
+    region = cache.get_region(*view, precision=2)
+    failed = set(region['errors'])
+
+    assert failed and len(region['tiles']) + len(failed) == len(geohash_cover(*view, 2))
+    calls = len(fetcher.calls)
+    assert set(cache.get_region(*view, precision=2)['errors']) == failed
+    assert len(fetcher.calls) == calls + len(failed)
+
+@pytest.mark.parametrize("view", [
+    (51.0, -0.9, 52.0, 0.7),
+    (51.5, -0.13, 51.52, -0.1),
+    (-40.0, -70.0, 10.0, -30.0),
+    (0.0, 0.0, 0.0, 0.0),
+])
+@pytest.mark.parametrize("max_tiles", [4, 24, 64])
+def test_choose_precision_is_finest_within_limit(tiles, view, max_tiles):
+    cache, _ = tiles
+    precision = cache.choose_precision(*view, max_tiles=max_tiles)
+
+    assert Config.TILE_MIN_PRECISION <= precision <= Config.TILE_MAX_PRECISION
+    if len(geohash_cover(*view, Config.TILE_MIN_PRECISION)) <= max_tiles:
+        assert len(geohash_cover(*view, precision)) <= max_tiles
+    if precision < Config.TILE_MAX_PRECISION:
+        assert len(geohash_cover(*view, precision + 1)) > max_tiles
+
+def test_region_tiles_fetch_behind_interactive_requests(api, upstream, monkeypatch):
+    seen = []
+    timed_get = WeatherAPI._timed_get
+
+    def recording(self, *args):
+        seen.append((threading.current_thread().name, current_priority()))
+        return timed_get(self, *args)
+    monkeypatch.setattr(WeatherAPI, '_timed_get', recording)
+    region = api.get_region_weather(*VIEW)
+
+    assert len(region['tiles']) == len(seen) <= Config.TILE_MAX_PER_VIEW
+    assert {priority for _, priority in seen} == {'batch'}
+    assert all(name.startswith("weather-tiles") for name, _ in seen)
@@ -0,0 +1,85 @@
+# test_units.py
+import numpy as np
+import pytest
+from units import convert_forecast, convert_series, convert_speed, convert_temperature, convert_weather, payload_units
+from conftest import forecast_payload, weather_payload
+
+UNITS = ['metric', 'imperial', 'standard']
+
+def canonical(data):
+    data['_metadata'] = {'units': 'metric'}
+    return data
+
+@pytest.mark.parametrize("celsius, fahrenheit, kelvin", [(0, 32, 273.15), (100, 212, 373.15), (-40, -40, 233.15)])
+def test_temperature_fixed_points(celsius, fahrenheit, kelvin):
+    values = {'metric': celsius, 'imperial': fahrenheit, 'standard': kelvin}
+    for source in UNITS:
+        for target in UNITS:
+            assert convert_temperature(values[source], source, target) == pytest.approx(values[target])
+
+def test_speed_conversion():
+    assert convert_speed(10.0, 'metric', 'imperial') == pytest.approx(22.369, abs=1e-3)
+    assert convert_speed(10.0, 'metric', 'standard') == 10.0
+    assert convert_speed(convert_speed(7.5, 'standard', 'imperial'), 'imperial', 'standard') == pytest.approx(7.5)
+
+@pytest.mark.parametrize("target", UNITS)
+def test_weather_round_trip(target):
+    data = canonical(weather_payload(1, "London"))
+    data['wind']['gust'] = 9.3
+    converted = convert_weather(data, target)
+    back = convert_weather(converted, 'metric')
+
+    assert payload_units(converted) == target
+    for field in ('temp', 'feels_like', 'temp_min', 'temp_max'):
+        assert back['main'][field] == pytest.approx(data['main'][field], abs=0.01)
+    for field in ('speed', 'gust'):
+        assert back['wind'][field] == pytest.approx(data['wind'][field], abs=0.01)
+    assert back['main']['pressure'] == data['main']['pressure']
+    assert data['_metadata'] == {'units': 'metric'}  # the input is not modified
+
+def test_weather_imperial_values():
+    converted = convert_weather(canonical(weather_payload(1, "London")), 'imperial')
+    assert converted['main']['temp'] == 59.0
+    assert converted['wind']['speed'] == pytest.approx(8.05)
+
+def test_same_units_return_the_payload():
+    data = canonical(weather_payload(1, "London"))
+    assert convert_weather(data, 'metric') is data
+    forecast = canonical(forecast_payload(1, "London"))
+    assert convert_forecast(forecast, 'metric') is forecast
+
+@pytest.mark.parametrize("target", UNITS)
+def test_forecast_round_trip(target):
+    data = canonical(forecast_payload(1, "London"))
+    back = convert_forecast(convert_forecast(data, target), 'metric')
+
+    for original, restored in zip(data['list'], back['list']):
+        for field, value in original['main'].items():
+            assert restored['main'][field] == pytest.approx(value, abs=0.01)
+        assert restored['wind']['speed'] == pytest.approx(original['wind']['speed'], abs=0.01)
+
+def test_forecast_with_missing_fields():
+    data = canonical(forecast_payload(1, "London"))
+    points = data['list']
+    del points[0]['wind']
+    del points[1]['main']
+    points[2]['main']['feels_like'] = None
+    del points[3]['main']['temp_max']
+
+    converted = convert_forecast(data, 'imperial')['list']
+
+    assert 'wind' not in converted[0] and converted[0]['main']['temp'] == pytest.approx(50.0)
+    assert 'main' not in converted[1] and converted[1]['wind']['speed'] == pytest.approx(8.95)
+    assert converted[2]['main']['feels_like'] is None
+    assert 'temp_max' not in converted[3]['main']
+    # NaN placeholders for the missing values never leak into the payload
+    for point in converted:
+        for group in ('main', 'wind'):
+            assert not any(isinstance(value, float) and np.isnan(value) for value in point.get(group, {}).values())
+
+def test_convert_series():
+    temps = np.array([0.0, np.nan, 100.0])
+    np.testing.assert_allclose(convert_series('temp', temps, 'metric', 'imperial'), [32.0, np.nan, 212.0])
+    np.testing.assert_allclose(convert_series('wind_speed', np.array([1.0]), 'imperial', 'metric'), [0.44704])
+    humidity = np.array([50.0, 60.0])
+    assert convert_series('humidity', humidity, 'metric', 'imperial') is humidity
@@ -0,0 +1,115 @@
+# test_weather_api.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from config import Config
+from utils import normalize_city_query
+from weather_app_API import WeatherAPIError
+
+def expire_now(monkeypatch):
+    """Make every cached weather payload stale as soon as it is stored"""
+    monkeypatch.setattr(Config, 'CACHE_DURATION', 0)
+
+def test_stale_entry_revalidates_with_its_etag(api, upstream, monkeypatch):
+    expire_now(monkeypatch)
+    upstream.responses['weather'] = [(200, {'ETag': '"v1"'}), (304, {})]
+    first = api.get_weather("London", log_search=False)
+    second = api.get_weather("London", log_search=False)
+
+    assert [headers for _, _, headers in upstream.calls] == [{}, {'If-None-Match': '"v1"'}]
+    assert second['main'] == first['main']
+    assert second['_metadata']['fingerprint'] == first['_metadata']['fingerprint']
+    assert second['_metadata']['fetch_time'] >= first['_metadata']['fetch_time']
+    # The cached payload is the only copy; no separate validator entry
+    assert not [key for key in api.cache._data if key.startswith("validator")]
+    assert [key for key in api.cache._data if key.startswith("weather")] == ["weather:id:1000"]
+
+def test_payload_with_validator_outlives_its_freshness(api, upstream):
+    upstream.responses['weather'] = [(200, {'Last-Modified': 'Tue, 14 Nov 2023 22:13:20 GMT'}), (200, {})]
+    api.get_weather("London", log_search=False)
+    api.get_weather("Paris", log_search=False)
+    expires = {key: expires_at - time.time() for key, (_, expires_at) in api.cache._data.items()}
+
+    assert expires["weather:id:1000"] == pytest.approx(Config.VALIDATOR_CACHE_DURATION, abs=5)
+    assert expires["weather:id:1001"] == pytest.approx(Config.CACHE_DURATION, abs=5)
+
+def test_not_modified_to_unconditional_request_keeps_its_status(api, upstream):
+    upstream.responses['weather'] = [(304, {})]
+    with pytest.raises(WeatherAPIError) as error:
+        api.get_weather("London", log_search=False)
+    assert error.value.status_code == 304
+
+def test_api_error_body_keeps_its_status(api, upstream, monkeypatch):
+    monkeypatch.setattr(upstream, 'body', lambda endpoint, params: {'cod': '404', 'message': 'city not found'})
+    with pytest.raises(WeatherAPIError) as error:
+        api.get_weather("Atlantis", log_search=False)
+    assert error.value.status_code == 404
+    assert "Unexpected" not in str(error.value)
+
+def test_multiple_cities_counts_each_city_once(api, upstream):
+    upstream.responses['weather'] = [(404, {})]
+    result = api.get_multiple_cities_weather(["Paris", "Tokyo", "Paris", "Tokyo", "Oslo"], log_search=False)
+
+    assert result['total_requested'] == 3
+    assert result['successful_count'] + result['error_count'] == result['total_requested']
+    assert result['error_count'] == 1
+    assert len(upstream.calls) == 3
+
+def test_module_functions_share_one_client(upstream, monkeypatch):
+    import weather_app_API
+    from config import Config
+    monkeypatch.setattr(Config, 'HISTORY_ENABLED', False)
+    monkeypatch.setattr(Config, 'CACHE_SNAPSHOT_ENABLED', False)
+    monkeypatch.setattr(Config, 'CACHE_BACKEND', 'memory')
+    monkeypatch.setattr(weather_app_API, '_default_api', None)
+
+    first = weather_app_API.get_weather("London")
+    second = weather_app_API.get_weather("london")
+    weather_app_API.get_forecast("London")
+
+    assert second == first
+    assert [endpoint for endpoint, _, _ in upstream.calls] == ['weather', 'forecast']
+    assert weather_app_API._shared_api() is weather_app_API._default_api
+
+# Query normalization and location coalescing
+
+@pytest.mark.parametrize("query, expected", [
+    ("London", "london"),
+    ("  LONDON  ", "london"),
+    (" London ,gb", "london,gb"),
+    ("London , GB,", "london,gb"),
+    ("Ｌｏｎｄｏｎ", "london"),
+    ("São   Paulo", "são paulo"),
+    ("Straße", "strasse"),
+    ("NYC", "new york,us"),
+])
+def test_normalize_city_query(query, expected):
+    assert normalize_city_query(query) == expected
+
+def weather_entries(api):
+    return sorted(key for key in api.cache._data if key.startswith("weather:"))
+
+def test_spellings_share_one_call_and_entry(api, upstream):
+    results = [api.get_weather(city, log_search=False) for city in ("london", " London ,gb", "LONDON", "london, GB")]
+
+    assert len(upstream.calls) == 1
+    assert weather_entries(api) == ["weather:id:1000"]
+    assert all(data['id'] == 1000 for data in results)
+
+def test_resolved_id_is_used_for_other_endpoints(api, upstream):
+    api.get_weather("london", log_search=False)
+    api.get_forecast(" London ,gb")
+
+    assert [(endpoint, params.get('q'), params.get('id')) for endpoint, params, _ in upstream.calls] == [
+        ('weather', "london", None), ('forecast', None, 1000)
+    ]
+
+def test_concurrent_spellings_share_one_request(api, upstream):
+    upstream.delay = 0.2
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda city: api.get_weather(city, log_search=False),
+                                    ["London", "london", " LONDON ", "London"]))
+
+    assert len(upstream.calls) == 1
+    assert {data['id'] for data in results} == {1000}
+    assert weather_entries(api) == ["weather:id:1000"]
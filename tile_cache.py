@@ -0,0 +1,144 @@
+# tile_cache.py
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future, wait
+from typing import Any, Callable, Dict, Tuple
+from config import Config
+from cache import TTLCache
+from spatial import geohash_bounds, geohash_cell_size, geohash_center, geohash_cover
+
+logger = logging.getLogger(__name__)
+
+# fetch(lat, lon, units) -> current weather payload
+TileFetcher = Callable[[float, float, str], Dict[str, Any]]
+
+class WeatherTileCache:
+    """
+    Latest conditions per geohash cell for map and region views
+
+    A region is covered with geohash tiles; tiles already cached and within
+    their TTL are served locally and only missing or expired tiles are
+    fetched, concurrently, at their cell centers. Panning or zooming a map
+    therefore costs upstream calls only for the newly exposed cells.
+
+    Each tile is one current-weather call. OpenWeatherMap's grouped
+    endpoints do not fit: the bounding-box city endpoint is retired and
+    'find' returns stations around a point rather than conditions at cell
+    centers. A cold view is instead bounded by Config.TILE_MAX_PER_VIEW
+    calls, run on the executor given here.
+    """
+
+    def __init__(self, fetch: TileFetcher, executor: Executor,
+                 maxsize: int = None, ttl: float = None):
+        self._fetch = fetch
+        self._executor = executor
+        self._tiles = TTLCache(
+            maxsize=maxsize or Config.TILE_CACHE_MAX_TILES,
+            ttl=ttl or Config.TILE_CACHE_DURATION
+        )
+        # (units, geohash) -> future of a fetch already in flight
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def choose_precision(self, south: float, west: float, north: float, east: float,
+                         max_tiles: int = None) -> int:
+        """Finest geohash precision whose cover of the region stays within max_tiles"""
+        max_tiles = max_tiles or Config.TILE_MAX_PER_VIEW
+        best = Config.TILE_MIN_PRECISION
+        for precision in range(Config.TILE_MIN_PRECISION, Config.TILE_MAX_PRECISION + 1):
+            lat_step, lon_step = geohash_cell_size(precision)
+            # Size of the cover without enumerating it
+            rows = math.floor((north + 90.0) / lat_step) - math.floor((south + 90.0) / lat_step) + 1
+            cols = math.floor((east + 180.0) / lon_step) - math.floor((west + 180.0) / lon_step) + 1
+            if rows * cols > max_tiles:
+                break
+            best = precision
+        return best
+
+    def get_region(self, south: float, west: float, north: float, east: float,
+                   units: str = "metric", precision: int = None) -> Dict[str, Any]:
+        """
+        Get conditions for every tile covering a bounding box
+
+        Args:
+            south (float): Southern latitude of the view
+            west (float): Western longitude of the view
+            north (float): Northern latitude of the view
+            east (float): Eastern longitude of the view
+            units (str): Temperature units
+            precision (int): Geohash length; chosen from the view size if omitted
+
+        Returns:
+            Dict with 'tiles', 'precision', 'cached' and 'fetched' counts and
+            per-geohash 'errors'
+        """
+        if south > north or west > east:
+            raise ValueError("Region bounds must satisfy south <= north and west <= east")
+
+        precision = precision or self.choose_precision(south, west, north, east)
+        cells = geohash_cover(south, west, north, east, precision)
+
+        tiles: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, Future] = {}
+        with self._lock:
+            for geohash in cells:
+                tile = self._tiles.get((units, geohash))
+                if tile is not None:
+                    tiles[geohash] = tile
+                    continue
+                future = self._inflight.get((units, geohash))
+                if future is None:
+                    future = self._executor.submit(self._fetch_tile, geohash, units)
+                    self._inflight[(units, geohash)] = future
+                pending[geohash] = future
+
+        cached = len(tiles)
+        errors: Dict[str, str] = {}
+        if pending:
+            wait(pending.values())
+            for geohash, future in pending.items():
+                try:
+                    tiles[geohash] = future.result()
+                except Exception as e:
+                    errors[geohash] = str(e)
+
+        if pending:
+            logger.info(f"Region tiles: {cached} cached, {len(pending)} fetched, {len(errors)} failed")
+        return {
+            'tiles': [tiles[geohash] for geohash in cells if geohash in tiles],
+            'precision': precision,
+            'cached': cached,
+            'fetched': len(pending) - len(errors),
+            'errors': errors
+        }
+
+    def _fetch_tile(self, geohash: str, units: str) -> Dict[str, Any]:
+        """Fetch and store the conditions at a tile's center"""
+        try:
+            lat, lon = geohash_center(geohash)
+            weather = self._fetch(lat, lon, units)
+            fetch_time = weather.get('_metadata', {}).get('fetch_time', time.time())
+            tile = {
+                'geohash': geohash,
+                'lat': lat,
+                'lon': lon,
+                'bounds': geohash_bounds(geohash),
+                'weather': weather,
+                'fetch_time': fetch_time
+            }
+            # Expire by when the conditions were observed, not when stored
+            self._tiles.set((units, geohash), tile, fetch_time=fetch_time)
+            return tile
+        finally:
+            with self._lock:
+                self._inflight.pop((units, geohash), None)
+
+    def clear(self):
+        """Drop all cached tiles"""
+        self._tiles.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return tile counts and hit/miss counters"""
+        return self._tiles.stats()
@@ -0,0 +1,124 @@
+# units.py
+from typing import Any, Dict
+import numpy as np
+from config import Config
+
+# Payload fields converted between unit systems
+TEMPERATURE_FIELDS = ('temp', 'feels_like', 'temp_min', 'temp_max')
+SPEED_FIELDS = ('speed', 'gust')
+
+MPS_PER_MPH = 0.44704
+
+def convert_temperature(values, from_units: str, to_units: str):
+    """Convert temperatures (scalars or arrays) between unit systems"""
+    if from_units == to_units:
+        return values
+    # Go through Celsius
+    if from_units == 'imperial':
+        values = (values - 32) * 5 / 9
+    elif from_units == 'standard':
+        values = values - 273.15
+    if to_units == 'imperial':
+        return values * 9 / 5 + 32
+    if to_units == 'standard':
+        return values + 273.15
+    return values
+
+def convert_speed(values, from_units: str, to_units: str):
+    """Convert wind speeds (scalars or arrays) between m/s and mph"""
+    from_mph, to_mph = from_units == 'imperial', to_units == 'imperial'
+    if from_mph == to_mph:
+        return values
+    return values * MPS_PER_MPH if from_mph else values / MPS_PER_MPH
+
+def convert_series(field: str, values: np.ndarray, from_units: str, to_units: str) -> np.ndarray:
+    """Convert a history series of a measurement field"""
+    if field in TEMPERATURE_FIELDS:
+        return convert_temperature(values, from_units, to_units)
+    if field == 'wind_speed':
+        return convert_speed(values, from_units, to_units)
+    return values
+
+def payload_units(data: Dict[str, Any]) -> str:
+    """Unit system a payload is expressed in"""
+    return data.get('_metadata', {}).get('units', Config.CANONICAL_UNITS)
+
+def _with_units(data: Dict[str, Any], units: str) -> Dict[str, Any]:
+    """Shallow copy of a payload with its metadata marked in units"""
+    return dict(data, _metadata=dict(data.get('_metadata', {}), units=units))
+
+def convert_weather(data: Dict[str, Any], units: str) -> Dict[str, Any]:
+    """
+    Current weather payload expressed in another unit system
+
+    Returns a new payload; the input (typically a cache entry) is not
+    modified. Pressure, humidity and visibility are the same in every
+    unit system.
+    """
+    from_units = payload_units(data)
+    if from_units == units:
+        return data
+
+    converted = _with_units(data, units)
+    if 'main' in data:
+        main = dict(data['main'])
+        for field in TEMPERATURE_FIELDS:
+            if main.get(field) is not None:
+                main[field] = round(float(convert_temperature(main[field], from_units, units)), 2)
+        converted['main'] = main
+    if 'wind' in data:
+        wind = dict(data['wind'])
+        for field in SPEED_FIELDS:
+            if wind.get(field) is not None:
+                wind[field] = round(float(convert_speed(wind[field], from_units, units)), 2)
+        converted['wind'] = wind
+    return converted
+
+def convert_forecast(data: Dict[str, Any], units: str) -> Dict[str, Any]:
+    """
+    Forecast payload expressed in another unit system
+
+    All points are converted at once as NumPy arrays rather than field by
+    field. Returns a new payload; the input is not modified.
+    """
+    from_units = payload_units(data)
+    if from_units == units:
+        return data
+
+    items = data.get('list', [])
+    count = len(items)
+    temps = {
+        field: np.round(convert_temperature(
+            np.array([item.get('main', {}).get(field, np.nan) for item in items], dtype=np.float64),
+            from_units, units
+        ), 2)
+        for field in TEMPERATURE_FIELDS
+    }
+    speeds = {
+        field: np.round(convert_speed(
+            np.array([item.get('wind', {}).get(field, np.nan) for item in items], dtype=np.float64),
+            from_units, units
+        ), 2)
+        for field in SPEED_FIELDS
+    }
+
+    converted_items = []
+    for i in range(count):
+        item = dict(items[i])
+        if 'main' in item:
+            main = dict(item['main'])
+            for field in TEMPERATURE_FIELDS:
+                if main.get(field) is not None:
+                    main[field] = float(temps[field][i])
+            item['main'] = main
+        if 'wind' in item:
+            wind = dict(item['wind'])
+            for field in SPEED_FIELDS:
+                if wind.get(field) is not None:
+                    wind[field] = float(speeds[field][i])
+            item['wind'] = wind
+        converted_items.append(item)
+
+    converted = _with_units(data, units)
+    converted['list'] = converted_items
+    return converted
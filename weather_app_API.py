@@ -1,306 +1,895 @@
-# weather_app_API.py
-import requests
-import logging
-import time
-from typing import Dict, List, Optional, Tuple, Any
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from config import Config
-from utils import log_search_history
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-class WeatherAPIError(Exception):
-    """Custom exception for Weather API errors"""
-    pass
-
-class WeatherAPI:
-    def __init__(self, api_key: str = None):
-        """Initialize WeatherAPI with configuration"""
-        self.api_key = api_key or Config.API_KEY
-        self.base_url = Config.BASE_URL
-        self.geocoding_url = Config.GEOCODING_URL
-        self.session = self._create_session()
-        
-    def _create_session(self) -> requests.Session:
-        """Create requests session with retry strategy"""
-        session = requests.Session()
-        
-        retry_strategy = Retry(
-            total=Config.MAX_RETRIES,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"],
-            backoff_factor=1
-        )
-        
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        
-        return session
-    
-    def _make_request(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make HTTP request with error handling"""
-        try:
-            params['appid'] = self.api_key
-            
-            logger.info(f"Making API request to: {url}")
-            response = self.session.get(
-                url, 
-                params=params, 
-                timeout=Config.REQUEST_TIMEOUT
-            )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            # Check for API-specific errors
-            if 'cod' in data and str(data['cod']) != '200':
-                error_msg = data.get('message', 'Unknown API error')
-                raise WeatherAPIError(f"API Error {data['cod']}: {error_msg}")
-            
-            return data
-            
-        except requests.exceptions.Timeout:
-            logger.error("Request timeout occurred")
-            raise WeatherAPIError("Request timeout. Please try again.")
-            
-        except requests.exceptions.ConnectionError:
-            logger.error("Connection error occurred")
-            raise WeatherAPIError("Connection error. Please check your internet connection.")
-            
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error occurred: {e}")
-            if response.status_code == 401:
-                raise WeatherAPIError("Invalid API key. Please check your configuration.")
-            elif response.status_code == 404:
-                raise WeatherAPIError("City not found. Please check the spelling.")
-            elif response.status_code == 429:
-                raise WeatherAPIError("API rate limit exceeded. Please try again later.")
-            else:
-                raise WeatherAPIError(f"HTTP Error {response.status_code}")
-                
-        except ValueError as e:
-            logger.error(f"JSON decode error: {e}")
-            raise WeatherAPIError("Invalid response from weather service.")
-            
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            raise WeatherAPIError(f"Unexpected error: {str(e)}")
-    
-    def get_coordinates(self, city: str) -> Tuple[float, float]:
-        """Get latitude and longitude for a city using geocoding API"""
-        try:
-            url = f"{self.geocoding_url}/direct"
-            params = {
-                'q': city,
-                'limit': 1
-            }
-            
-            data = self._make_request(url, params)
-            
-            if not data:
-                raise WeatherAPIError(f"City '{city}' not found")
-            
-            location = data[0]
-            lat = location['lat']
-            lon = location['lon']
-            
-            logger.info(f"Coordinates for {city}: ({lat}, {lon})")
-            return lat, lon
-            
-        except Exception as e:
-            logger.error(f"Error getting coordinates for {city}: {e}")
-            raise WeatherAPIError(f"Could not find coordinates for {city}")
-    
-    def get_weather(self, city: str, units: str = "metric") -> Dict[str, Any]:
-        """
-        Get current weather data for a city
-        
-        Args:
-            city (str): City name
-            units (str): Temperature units (metric, imperial, standard)
-            
-        Returns:
-            Dict containing weather data
-        """
-        try:
-            start_time = time.time()
-            
-            url = f"{self.base_url}/weather"
-            params = {
-                'q': city,
-                'units': units
-            }
-            
-            data = self._make_request(url, params)
-            
-            # Log successful search
-            log_search_history(city, success=True)
-            
-            # Add metadata
-            data['_metadata'] = {
-                'city_searched': city,
-                'units': units,
-                'fetch_time': time.time(),
-                'response_time': time.time() - start_time
-            }
-            
-            logger.info(f"Successfully fetched weather for {city}")
-            return data
-            
-        except WeatherAPIError as e:
-            log_search_history(city, success=False)
-            logger.error(f"Weather API error for {city}: {e}")
-            raise
-            
-        except Exception as e:
-            log_search_history(city, success=False)
-            logger.error(f"Unexpected error getting weather for {city}: {e}")
-            raise WeatherAPIError(f"Error fetching weather data: {str(e)}")
-    
-    def get_forecast(self, city: str, days: int = 5, units: str = "metric") -> Dict[str, Any]:
-        """
-        Get weather forecast for a city
-        
-        Args:
-            city (str): City name
-            days (int): Number of days (1-5)
-            units (str): Temperature units
-            
-        Returns:
-            Dict containing forecast data
-        """
-        try:
-            start_time = time.time()
-            
-            # Validate days parameter
-            if not 1 <= days <= 5:
-                raise ValueError("Days must be between 1 and 5")
-            
-            url = f"{self.base_url}/forecast"
-            params = {
-                'q': city,
-                'units': units,
-                'cnt': days * 8  # 8 forecasts per day (every 3 hours)
-            }
-            
-            data = self._make_request(url, params)
-            
-            # Add metadata
-            data['_metadata'] = {
-                'city_searched': city,
-                'units': units,
-                'days_requested': days,
-                'fetch_time': time.time(),
-                'response_time': time.time() - start_time
-            }
-            
-            logger.info(f"Successfully fetched {days}-day forecast for {city}")
-            return data
-            
-        except WeatherAPIError as e:
-            logger.error(f"Forecast API error for {city}: {e}")
-            raise
-            
-        except Exception as e:
-            logger.error(f"Unexpected error getting forecast for {city}: {e}")
-            raise WeatherAPIError(f"Error fetching forecast data: {str(e)}")
-    
-    def get_weather_by_coordinates(self, lat: float, lon: float, units: str = "metric") -> Dict[str, Any]:
-        """Get weather data by latitude and longitude"""
-        try:
-            url = f"{self.base_url}/weather"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'units': units
-            }
-            
-            data = self._make_request(url, params)
-            
-            # Add metadata
-            data['_metadata'] = {
-                'coordinates': (lat, lon),
-                'units': units,
-                'fetch_time': time.time()
-            }
-            
-            logger.info(f"Successfully fetched weather for coordinates ({lat}, {lon})")
-            return data
-            
-        except Exception as e:
-            logger.error(f"Error getting weather by coordinates: {e}")
-            raise WeatherAPIError(f"Error fetching weather data: {str(e)}")
-    
-    def get_air_quality(self, lat: float, lon: float) -> Dict[str, Any]:
-        """Get air quality data for coordinates"""
-        try:
-            url = "http://api.openweathermap.org/data/2.5/air_pollution"
-            params = {
-                'lat': lat,
-                'lon': lon
-            }
-            
-            data = self._make_request(url, params)
-            
-            logger.info(f"Successfully fetched air quality for ({lat}, {lon})")
-            return data
-            
-        except Exception as e:
-            logger.error(f"Error getting air quality: {e}")
-            raise WeatherAPIError(f"Error fetching air quality data: {str(e)}")
-    
-    def search_cities(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Search for cities matching query"""
-        try:
-            url = f"{self.geocoding_url}/direct"
-            params = {
-                'q': query,
-                'limit': limit
-            }
-            
-            data = self._make_request(url, params)
-            
-            logger.info(f"Found {len(data)} cities matching '{query}'")
-            return data
-            
-        except Exception as e:
-            logger.error(f"Error searching cities: {e}")
-            raise WeatherAPIError(f"Error searching cities: {str(e)}")
-    
-    def get_multiple_cities_weather(self, cities: List[str], units: str = "metric") -> Dict[str, Any]:
-        """Get weather data for multiple cities"""
-        results = {}
-        errors = {}
-        
-        for city in cities:
-            try:
-                weather_data = self.get_weather(city, units)
-                results[city] = weather_data
-                time.sleep(0.1)  # Small delay to avoid rate limiting
-                
-            except Exception as e:
-                errors[city] = str(e)
-                logger.error(f"Failed to get weather for {city}: {e}")
-        
-        return {
-            'successful': results,
-            'errors': errors,
-            'total_requested': len(cities),
-            'successful_count': len(results),
-            'error_count': len(errors)
-        }
-
-# Convenience functions for backward compatibility
-def get_weather(city: str, units: str = "metric") -> Dict[str, Any]:
-    """Convenience function to get current weather"""
-    api = WeatherAPI()
-    return api.get_weather(city, units)
-
-def get_forecast(city: str, days: int = 3, units: str = "metric") -> Dict[str, Any]:
-    """Convenience function to get weather forecast"""
-    api = WeatherAPI()
-    return api.get_forecast(city, days, units)
\ No newline at end of file
+# weather_app_API.py
+import requests
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from requests.adapters import HTTPAdapter
+from config import Config
+from utils import log_search_history, normalize_city_query
+from history_store import HistoryStore
+from cache import CacheBackend, CacheSnapshotter, SingleFlight, TTLCache, cache_key, create_cache_backend, snap_to_grid
+from spatial import SpatialIndex
+from tile_cache import WeatherTileCache
+from units import convert_forecast, convert_weather
+from resilience import RETRY_STATUSES, LatencyTracker, RetryBudget, backoff_delay, parse_retry_after
+from scheduler import PRIORITIES, RequestScheduler, current_priority, priority, run_with_priority
+from analytics import SearchAnalytics
+from forecast_summary import MAX_FORECAST_DAYS, POINTS_PER_DAY, slice_forecast
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class WeatherAPIError(Exception):
+    """Custom exception for Weather API errors"""
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        # Upstream HTTP status, when the error came from an HTTP response
+        self.status_code = status_code
+
+class WeatherAPI:
+    def __init__(self, api_key: str = None, history_store: Optional[HistoryStore] = None,
+                 cache_backend: Optional[CacheBackend] = None):
+        """Initialize WeatherAPI with configuration"""
+        self.api_key = api_key or Config.API_KEY
+        self.base_url = Config.BASE_URL
+        self.geocoding_url = Config.GEOCODING_URL
+        self.session = self._create_session()
+        self.latency = LatencyTracker()
+        self.retry_budget = RetryBudget()
+        self.scheduler = RequestScheduler()
+        # First attempts of hedged requests each hold a scheduler slot, so a
+        # pool as large as the scheduler never queues them; duplicates get
+        # their own smaller pool
+        self._attempt_executor = ThreadPoolExecutor(max_workers=self.scheduler.total, thread_name_prefix="weather-attempt")
+        self._hedge_executor = ThreadPoolExecutor(max_workers=Config.HEDGE_WORKERS, thread_name_prefix="weather-hedge")
+        self.history = history_store or self._create_history_store()
+        self.cache = cache_backend or create_cache_backend()
+        self.snapshotter = self._create_snapshotter() if cache_backend is None else None
+        # Normalized query -> location id it resolved to (mirrored in self.cache)
+        self.location_ids = TTLCache(maxsize=Config.CACHE_MAX_ENTRIES, ttl=Config.LOCATION_ID_CACHE_DURATION)
+        self._inflight = SingleFlight()
+        self.analytics = SearchAnalytics()
+        # Observation locations -> cache keys of their payloads
+        self.observation_index = SpatialIndex(max_age=Config.CACHE_DURATION)
+        self.city_index = SpatialIndex(cell_degrees=Config.CITY_INDEX_CELL_DEGREES)
+        # One worker pool per priority class, so queued batch or background
+        # work never holds the threads interactive requests run on
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=Config.MAX_WORKERS if name == 'interactive' else Config.SCHEDULER_LIMITS[name],
+                                     thread_name_prefix=f"weather-{name}")
+            for name in PRIORITIES
+        }
+        # Tile fan-out gets its own threads and queues behind interactive
+        # requests for upstream slots, so a cold map view never starves
+        # other sessions' lookups
+        self._tile_executor = ThreadPoolExecutor(max_workers=Config.TILE_WORKERS, thread_name_prefix="weather-tiles")
+        self.tile_cache = WeatherTileCache(
+            partial(run_with_priority, 'batch', self.get_weather_by_coordinates), self._tile_executor
+        )
+        
+    def _create_history_store(self) -> Optional[HistoryStore]:
+        """Create the local observation store if history is enabled"""
+        if not Config.HISTORY_ENABLED:
+            return None
+        try:
+            return HistoryStore()
+        except Exception as e:
+            logger.warning(f"History store unavailable: {e}")
+            return None
+    
+    def _create_snapshotter(self) -> Optional[CacheSnapshotter]:
+        """Warm-start the default cache from its last snapshot and keep saving it"""
+        if not Config.CACHE_SNAPSHOT_ENABLED or self.cache.persistent:
+            return None
+        snapshotter = CacheSnapshotter(self.cache)
+        snapshotter.start()
+        return snapshotter
+    
+    def _record_history(self, kind: str, data: Dict[str, Any]):
+        """Queue a fetched payload for the history store without failing the request"""
+        if self.history is None:
+            return
+        try:
+            if kind == 'forecast':
+                self.history.record_forecast(data)
+            else:
+                self.history.record_weather(data)
+        except Exception as e:
+            logger.warning(f"Could not record {kind} history: {e}")
+    
+    def _record_search(self, data: Dict[str, Any]):
+        """Count one user search in the analytics, keyed by the location it resolved to"""
+        location = data.get('city') or data
+        if location.get('id') is None:
+            return
+        country = location.get('country') or location.get('sys', {}).get('country')
+        name = location.get('name', '')
+        self.analytics.record(location['id'], f"{name}, {country}" if country else name)
+    
+    def _is_fresh(self, data: Optional[Dict[str, Any]], ttl: float) -> bool:
+        """Whether a cached payload was fetched within ttl seconds"""
+        if data is None:
+            return False
+        fetch_time = data.get('_metadata', {}).get('fetch_time')
+        return fetch_time is None or time.time() - fetch_time < ttl
+    
+    def _store(self, key: str, data: Dict[str, Any], ttl: float):
+        """
+        Cache a fetched payload
+        
+        A payload with a validator is kept for Config.VALIDATOR_CACHE_DURATION
+        even when it is fresh for less, so once stale it can still answer a
+        conditional request's 304; readers check freshness with _is_fresh.
+        """
+        metadata = data.get('_metadata', {})
+        if metadata.get('etag') or metadata.get('last_modified'):
+            ttl = max(ttl, Config.VALIDATOR_CACHE_DURATION)
+        self.cache.set(key, data, ttl)
+        
+    def _submit(self, fn: Callable, *args) -> Future:
+        """Run fn on the caller's priority class worker pool, in the caller's context"""
+        return self._executors[current_priority()].submit(contextvars.copy_context().run, fn, *args)
+    
+    def _create_session(self) -> requests.Session:
+        """Create requests session with a pooled adapter (retries are handled by _send)"""
+        session = requests.Session()
+        
+        adapter = HTTPAdapter(
+            max_retries=0,
+            pool_connections=Config.CONNECTION_POOL_SIZE,
+            pool_maxsize=Config.CONNECTION_POOL_SIZE
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        
+        return session
+    
+    def _timed_get(self, endpoint: str, url: str, params: Dict[str, Any],
+                   headers: Dict[str, str], timeout: float) -> requests.Response:
+        """Single GET whose latency feeds the endpoint's percentiles"""
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        except requests.exceptions.Timeout:
+            self.latency.record(endpoint, timeout)
+            raise
+        self.latency.record(endpoint, time.monotonic() - start)
+        return response
+    
+    def _hedged_get(self, endpoint: str, url: str, params: Dict[str, Any],
+                    headers: Dict[str, str], timeout: float) -> requests.Response:
+        """
+        GET that sends a duplicate if the first attempt outlives the p95 latency
+        
+        Whichever attempt answers first wins; the other is left to finish in
+        the background. Hedges are off unless Config.HEDGE_REQUESTS is set
+        and draw on the same budget as retries. The delay counts from when
+        the first attempt is actually sent.
+        """
+        delay = self.latency.hedge_delay(endpoint) if Config.HEDGE_REQUESTS else None
+        if delay is None:
+            return self._timed_get(endpoint, url, params, headers, timeout)
+        
+        started = threading.Event()
+        
+        def attempt() -> requests.Response:
+            started.set()
+            return self._timed_get(endpoint, url, params, headers, timeout)
+        
+        first = self._attempt_executor.submit(attempt)
+        started.wait()
+        done, _ = wait([first], timeout=delay)
+        if done or not self.retry_budget.try_spend():
+            return first.result()
+        
+        logger.info(f"Hedging {endpoint} request after {delay:.2f}s")
+        second = self._hedge_executor.submit(self._timed_get, endpoint, url, params, headers, timeout)
+        error = None
+        for future in as_completed([first, second]):
+            try:
+                return future.result()
+            except requests.exceptions.RequestException as e:
+                error = e
+        raise error
+    
+    def _send(self, url: str, params: Dict[str, Any], headers: Dict[str, str]) -> requests.Response:
+        """
+        GET with adaptive timeouts and budgeted, jittered retries
+        
+        Timeouts, connection errors and retryable statuses are retried up
+        to Config.MAX_RETRIES times while the retry budget allows, waiting
+        at least as long as a Retry-After header asks. Each attempt waits
+        for a scheduler slot in the caller's priority class. The last
+        response is returned (or the last error raised) for _make_request
+        to map.
+        """
+        endpoint = url.rsplit('/', 1)[-1]
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                # The slot is released while backing off between attempts
+                with self.scheduler.slot():
+                    response = self._hedged_get(endpoint, url, params, headers, self.latency.timeout(endpoint))
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if attempt >= Config.MAX_RETRIES or not self.retry_budget.try_spend():
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= Config.MAX_RETRIES:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if (retry_after is not None and retry_after > Config.RETRY_AFTER_MAX) or not self.retry_budget.try_spend():
+                    return response
+            
+            delay = backoff_delay(attempt, retry_after)
+            attempt += 1
+            logger.warning(f"Retrying {endpoint} request in {delay:.2f}s (attempt {attempt} of {Config.MAX_RETRIES})")
+            time.sleep(delay)
+    
+    def _make_request(self, url: str, params: Dict[str, Any],
+                      stored: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Make HTTP request with error handling
+        
+        stored is the cached payload for the same request, even if no
+        longer fresh. If it carries an ETag or Last-Modified validator the
+        request is sent conditionally, and a 304 returns stored without
+        downloading or decoding a body. Dict payloads get a '_metadata'
+        entry with a 'fingerprint' of the response body, so unchanged data
+        can be recognized downstream, and the response's validators.
+        """
+        validators = stored.get('_metadata', {}) if isinstance(stored, dict) else {}
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        
+        try:
+            params['appid'] = self.api_key
+            
+            logger.info(f"Making API request to: {url}")
+            response = self._send(url, params, headers)
+            
+            if response.status_code == 304:
+                if headers:
+                    logger.info(f"Upstream data unchanged for {url}; reusing stored payload")
+                    return stored
+                raise WeatherAPIError("Weather service returned no data for an unconditional request.", 304)
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            # Check for API-specific errors
+            if 'cod' in data and str(data['cod']) != '200':
+                error_msg = data.get('message', 'Unknown API error')
+                status = int(data['cod']) if str(data['cod']).isdigit() else None
+                raise WeatherAPIError(f"API Error {data['cod']}: {error_msg}", status)
+            
+            if isinstance(data, dict):
+                data['_metadata'] = {
+                    'fingerprint': hashlib.blake2b(response.content, digest_size=16).hexdigest(),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+            
+            return data
+            
+        except WeatherAPIError:
+            raise
+            
+        except requests.exceptions.Timeout:
+            logger.error("Request timeout occurred")
+            raise WeatherAPIError("Request timeout. Please try again.")
+            
+        except requests.exceptions.ConnectionError:
+            logger.error("Connection error occurred")
+            raise WeatherAPIError("Connection error. Please check your internet connection.")
+            
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"HTTP error occurred: {e}")
+            status = response.status_code
+            if status == 401:
+                raise WeatherAPIError("Invalid API key. Please check your configuration.", status)
+            elif status == 404:
+                raise WeatherAPIError("City not found. Please check the spelling.", status)
+            elif status == 429:
+                raise WeatherAPIError("API rate limit exceeded. Please try again later.", status)
+            else:
+                raise WeatherAPIError(f"HTTP Error {status}", status)
+                
+        except ValueError as e:
+            logger.error(f"JSON decode error: {e}")
+            raise WeatherAPIError("Invalid response from weather service.")
+            
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+            raise WeatherAPIError(f"Unexpected error: {str(e)}")
+    
+    def get_coordinates(self, city: str) -> Tuple[float, float]:
+        """Get latitude and longitude for a city using geocoding API"""
+        try:
+            query = normalize_city_query(city)
+            key = cache_key('geocode', query)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return tuple(cached)
+            
+            url = f"{self.geocoding_url}/direct"
+            params = {
+                'q': query,
+                'limit': 1
+            }
+            
+            data = self._make_request(url, params)
+            
+            if not data:
+                raise WeatherAPIError(f"City '{city}' not found")
+            
+            location = data[0]
+            lat = location['lat']
+            lon = location['lon']
+            self.cache.set(key, [lat, lon], Config.GEOCODING_CACHE_DURATION)
+            
+            logger.info(f"Coordinates for {city}: ({lat}, {lon})")
+            return lat, lon
+            
+        except Exception as e:
+            logger.error(f"Error getting coordinates for {city}: {e}")
+            raise WeatherAPIError(f"Could not find coordinates for {city}")
+    
+    def _location_id(self, query: str) -> Optional[int]:
+        """Location id a normalized query resolved to before, if known"""
+        location_id = self.location_ids.get(query)
+        if location_id is None:
+            location_id = self.cache.get(cache_key('location', query))
+            if location_id is not None:
+                self.location_ids.set(query, location_id)
+        return location_id
+    
+    def _remember_location(self, query: str, location_id: Optional[int],
+                           name: Optional[str] = None, country: Optional[str] = None):
+        """
+        Record the location id a normalized query resolved to
+        
+        With the resolved name and country, the canonical "name,country"
+        spelling is recorded too, so "london" and "London, GB" share a
+        location after either has been fetched once.
+        """
+        if location_id is None:
+            return
+        queries = [query]
+        if name and country:
+            queries.append(normalize_city_query(f"{name},{country}"))
+        for known in queries:
+            if self.location_ids.get(known) != location_id:
+                self.location_ids.set(known, location_id)
+                self.cache.set(cache_key('location', known), location_id, Config.LOCATION_ID_CACHE_DURATION)
+    
+    def _location_target(self, query: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Cache key suffix and upstream params for a normalized city query
+        
+        Once a query has resolved, every spelling of it is keyed and fetched
+        by the location id, so they share one cache entry and one in-flight
+        request.
+        """
+        location_id = self._location_id(query)
+        if location_id is not None:
+            return f"id:{location_id}", {'id': location_id}
+        return query, {'q': query}
+    
+    def get_weather(self, city: str, units: str = "metric", log_search: bool = True) -> Dict[str, Any]:
+        """
+        Get current weather data for a city
+        
+        Args:
+            city (str): City name
+            units (str): Temperature units (metric, imperial, standard)
+            log_search (bool): Add the search to the Streamlit session history
+                (off for callers outside the app, such as the HTTP service)
+            
+        Returns:
+            Dict containing weather data
+        """
+        if not log_search:
+            data = self._fetch_weather(city, units)
+            self._record_search(data)
+            return data
+        
+        try:
+            data = self._fetch_weather(city, units)
+            self._record_search(data)
+            
+            # Log successful search
+            log_search_history(city, success=True)
+            return data
+            
+        except WeatherAPIError:
+            log_search_history(city, success=False)
+            raise
+    
+    def _fetch_weather(self, city: str, units: str = "metric") -> Dict[str, Any]:
+        """
+        Fetch current weather without touching session state (safe in worker threads)
+        
+        Weather is fetched and cached in Config.CANONICAL_UNITS and converted
+        locally, so every unit system shares one cache entry.
+        """
+        try:
+            start_time = time.time()
+            
+            query = normalize_city_query(city)
+            target, params = self._location_target(query)
+            key = cache_key('weather', target)
+            cached = self.cache.get(key)
+            if self._is_fresh(cached, Config.CACHE_DURATION):
+                logger.info(f"Serving weather for {city} from {self.cache.name} cache")
+                return convert_weather(cached, units)
+            
+            def fetch() -> Dict[str, Any]:
+                url = f"{self.base_url}/weather"
+                data = self._make_request(url, dict(params, units=Config.CANONICAL_UNITS), cached)
+                
+                # Add metadata
+                data.setdefault('_metadata', {}).update({
+                    'city_searched': city,
+                    'units': Config.CANONICAL_UNITS,
+                    'fetch_time': time.time(),
+                    'response_time': time.time() - start_time
+                })
+                
+                self._remember_location(query, data.get('id'), data.get('name'), data.get('sys', {}).get('country'))
+                stored_key = cache_key('weather', f"id:{data['id']}") if 'id' in data else key
+                self._store(stored_key, data, Config.CACHE_DURATION)
+                self._record_history('weather', data)
+                self._index_observation(data, stored_key)
+                
+                logger.info(f"Successfully fetched weather for {city}")
+                return data
+            
+            return convert_weather(self._inflight.do(key, fetch), units)
+            
+        except WeatherAPIError as e:
+            logger.error(f"Weather API error for {city}: {e}")
+            raise
+            
+        except Exception as e:
+            logger.error(f"Unexpected error getting weather for {city}: {e}")
+            raise WeatherAPIError(f"Error fetching weather data: {str(e)}")
+    
+    def get_forecast(self, city: str, days: int = 5, units: str = "metric") -> Dict[str, Any]:
+        """
+        Get weather forecast for a city
+        
+        The full 5-day forecast is fetched and cached once in
+        Config.CANONICAL_UNITS; each call slices the requested days from it
+        and converts them locally, so changing days or units never calls
+        the upstream.
+        
+        Args:
+            city (str): City name
+            days (int): Number of days (1-5)
+            units (str): Temperature units
+            
+        Returns:
+            Dict containing forecast data
+        """
+        data = self._fetch_forecast(city, days, units)
+        self._record_search(data)
+        return data
+    
+    def _fetch_forecast(self, city: str, days: int = 5, units: str = "metric") -> Dict[str, Any]:
+        """Fetch a forecast without counting it as a search (see get_forecast)"""
+        try:
+            start_time = time.time()
+            
+            # Validate days parameter
+            if not 1 <= days <= MAX_FORECAST_DAYS:
+                raise ValueError(f"Days must be between 1 and {MAX_FORECAST_DAYS}")
+            
+            query = normalize_city_query(city)
+            target, params = self._location_target(query)
+            key = cache_key('forecast', target)
+            cached = self.cache.get(key)
+            if self._is_fresh(cached, Config.CACHE_DURATION):
+                logger.info(f"Serving {days}-day forecast for {city} from {self.cache.name} cache")
+                return convert_forecast(slice_forecast(cached, days), units)
+            
+            def fetch() -> Dict[str, Any]:
+                url = f"{self.base_url}/forecast"
+                data = self._make_request(url, dict(
+                    params,
+                    units=Config.CANONICAL_UNITS,
+                    cnt=MAX_FORECAST_DAYS * POINTS_PER_DAY
+                ), cached)
+                
+                # Add metadata
+                data.setdefault('_metadata', {}).update({
+                    'city_searched': city,
+                    'units': Config.CANONICAL_UNITS,
+                    'fetch_time': time.time(),
+                    'response_time': time.time() - start_time
+                })
+                
+                location = data.get('city', {})
+                location_id = location.get('id')
+                self._remember_location(query, location_id, location.get('name'), location.get('country'))
+                self._store(cache_key('forecast', f"id:{location_id}") if location_id else key,
+                            data, Config.CACHE_DURATION)
+                self._record_history('forecast', data)
+                
+                logger.info(f"Successfully fetched forecast for {city}")
+                return data
+            
+            return convert_forecast(slice_forecast(self._inflight.do(key, fetch), days), units)
+            
+        except WeatherAPIError as e:
+            logger.error(f"Forecast API error for {city}: {e}")
+            raise
+            
+        except Exception as e:
+            logger.error(f"Unexpected error getting forecast for {city}: {e}")
+            raise WeatherAPIError(f"Error fetching forecast data: {str(e)}")
+    
+    def get_weather_by_coordinates(self, lat: float, lon: float, units: str = "metric") -> Dict[str, Any]:
+        """
+        Get weather data by latitude and longitude
+        
+        An observation fetched within Config.COORD_CACHE_RADIUS_KM and
+        Config.CACHE_DURATION is reused instead of calling upstream.
+        """
+        try:
+            nearby = self.observation_index.nearest(
+                lat, lon, max_km=Config.COORD_CACHE_RADIUS_KM, max_age=Config.CACHE_DURATION
+            )
+            # The index holds cache keys; the payload may have been evicted since
+            cached = self.cache.get(nearby[0]) if nearby is not None else None
+            if self._is_fresh(cached, Config.CACHE_DURATION):
+                distance = nearby[1]
+                logger.info(f"Serving weather for ({lat}, {lon}) from observation {distance:.2f} km away")
+                data = dict(cached)
+                data['_metadata'] = dict(
+                    cached['_metadata'],
+                    coordinates=(lat, lon),
+                    cache_distance_km=distance
+                )
+                return convert_weather(data, units)
+            
+            # Points within ~1 km share an entry in the shared cache
+            key = cache_key('coords', f"{lat:.2f}", f"{lon:.2f}")
+            cached = self.cache.get(key)
+            if self._is_fresh(cached, Config.CACHE_DURATION):
+                return convert_weather(cached, units)
+            
+            url = f"{self.base_url}/weather"
+            params = {
+                'lat': lat,
+                'lon': lon,
+                'units': Config.CANONICAL_UNITS
+            }
+            
+            data = self._make_request(url, params, cached)
+            
+            # Add metadata
+            data.setdefault('_metadata', {}).update({
+                'coordinates': (lat, lon),
+                'units': Config.CANONICAL_UNITS,
+                'fetch_time': time.time()
+            })
+            
+            self._store(key, data, Config.CACHE_DURATION)
+            self._record_history('weather', data)
+            self._index_observation(data, key)
+            
+            logger.info(f"Successfully fetched weather for coordinates ({lat}, {lon})")
+            return convert_weather(data, units)
+            
+        except Exception as e:
+            logger.error(f"Error getting weather by coordinates: {e}")
+            raise WeatherAPIError(f"Error fetching weather data: {str(e)}")
+    
+    def _index_observation(self, data: Dict[str, Any], key: str):
+        """
+        Add a freshly fetched canonical-unit weather payload, cached under key,
+        to the observation and city indexes
+        
+        Only fresh fetches are indexed: the observation index expires points
+        oldest first by insertion order, which re-inserting cache hits with
+        their older fetch times would break.
+        """
+        try:
+            lat, lon = data['coord']['lat'], data['coord']['lon']
+            fetch_time = data['_metadata']['fetch_time']
+            self.observation_index.insert((round(lat, 4), round(lon, 4)), lat, lon, key, fetch_time)
+            self.city_index.insert(
+                ('id', data['id']), lat, lon,
+                {'id': data['id'], 'name': data['name'], 'country': data.get('sys', {}).get('country'),
+                 'lat': lat, 'lon': lon}
+            )
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Could not index observation: {e}")
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Cache backend statistics plus the size of the in-process spatial indexes"""
+        return dict(
+            self.cache.stats(),
+            observation_index=self.observation_index.stats(),
+            city_index=self.city_index.stats()
+        )
+    
+    def nearest_city(self, lat: float, lon: float, max_km: float = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the closest known city to a point
+        
+        Known cities are those seen in weather payloads or city searches.
+        
+        Returns:
+            City dict with 'distance_km', or None if no city qualifies
+        """
+        found = self.city_index.nearest(lat, lon, max_km=max_km)
+        if found is None:
+            return None
+        city, distance = found
+        return dict(city, distance_km=distance)
+    
+    def get_region_weather(self, south: float, west: float, north: float, east: float,
+                           units: str = "metric", precision: int = None) -> Dict[str, Any]:
+        """
+        Get conditions across a map region as geohash tiles
+        
+        Only tiles missing from the tile cache or past Config.TILE_CACHE_DURATION
+        are fetched, so panning and zooming reuse what is already on screen.
+        """
+        try:
+            region = self.tile_cache.get_region(
+                south, west, north, east, units=Config.CANONICAL_UNITS, precision=precision
+            )
+        except ValueError as e:
+            raise WeatherAPIError(str(e))
+        region['tiles'] = [dict(tile, weather=convert_weather(tile['weather'], units)) for tile in region['tiles']]
+        return region
+    
+    def get_air_quality(self, lat: float, lon: float) -> Dict[str, Any]:
+        """
+        Get air quality data for coordinates
+        
+        Coordinates are snapped to a Config.AQI_GRID_DEGREES grid and
+        results are cached per cell, so nearby locations share one entry.
+        """
+        try:
+            cell_lat, cell_lon = snap_to_grid(lat, lon, Config.AQI_GRID_DEGREES)
+            key = cache_key('air_quality', cell_lat, cell_lon)
+            
+            cached = self.cache.get(key)
+            if self._is_fresh(cached, Config.AQI_CACHE_DURATION):
+                logger.info(f"Air quality cache hit for ({lat}, {lon})")
+                return cached
+            
+            url = Config.AIR_QUALITY_URL
+            params = {
+                'lat': cell_lat,
+                'lon': cell_lon
+            }
+            
+            data = self._make_request(url, params, cached)
+            
+            # Add metadata
+            data.setdefault('_metadata', {}).update({
+                'coordinates': (lat, lon),
+                'grid_cell': (cell_lat, cell_lon),
+                'fetch_time': time.time()
+            })
+            
+            self._store(key, data, Config.AQI_CACHE_DURATION)
+            
+            logger.info(f"Successfully fetched air quality for ({lat}, {lon})")
+            return data
+            
+        except Exception as e:
+            logger.error(f"Error getting air quality: {e}")
+            raise WeatherAPIError(f"Error fetching air quality data: {str(e)}", getattr(e, 'status_code', None))
+    
+    def search_cities(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Search for cities matching query"""
+        try:
+            key = cache_key('search', limit, normalize_city_query(query))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            
+            url = f"{self.geocoding_url}/direct"
+            params = {
+                'q': query,
+                'limit': limit
+            }
+            
+            data = self._make_request(url, params)
+            self.cache.set(key, data, Config.GEOCODING_CACHE_DURATION)
+            
+            for city in data:
+                self.city_index.insert(
+                    ('geo', city['name'], city.get('country'), round(city['lat'], 4), round(city['lon'], 4)),
+                    city['lat'], city['lon'],
+                    {'name': city['name'], 'country': city.get('country'), 'state': city.get('state'),
+                     'lat': city['lat'], 'lon': city['lon']}
+                )
+            
+            logger.info(f"Found {len(data)} cities matching '{query}'")
+            return data
+            
+        except Exception as e:
+            logger.error(f"Error searching cities: {e}")
+            raise WeatherAPIError(f"Error searching cities: {str(e)}", getattr(e, 'status_code', None))
+    
+    def get_city_bundle(self, city: str, units: str = "metric", days: int = 5,
+                        include_forecast: bool = True,
+                        include_air_quality: bool = True) -> Dict[str, Any]:
+        """
+        Get current weather, forecast and air quality for a city concurrently
+        
+        Weather and forecast are requested in parallel. Air quality starts as
+        soon as either payload provides coordinates, so no separate geocoding
+        call is needed and latency is bounded by the slowest chain.
+        
+        Args:
+            city (str): City name
+            units (str): Temperature units
+            days (int): Forecast days (1-5)
+            include_forecast (bool): Fetch the forecast
+            include_air_quality (bool): Fetch air quality
+            
+        Returns:
+            Dict with 'weather', 'forecast', 'air_quality' and per-part 'errors'
+        """
+        start_time = time.time()
+        bundle = {'weather': None, 'forecast': None, 'air_quality': None, 'errors': {}}
+        
+        futures = {self._submit(self._fetch_weather, city, units): 'weather'}
+        if include_forecast:
+            futures[self._submit(self._fetch_forecast, city, days, units)] = 'forecast'
+        
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                part = futures[future]
+                try:
+                    bundle[part] = future.result()
+                except Exception as e:
+                    bundle['errors'][part] = str(e)
+                    continue
+                
+                coords = _payload_coordinates(part, bundle[part])
+                if include_air_quality and 'air_quality' not in futures.values() and coords:
+                    aqi_future = self._submit(self.get_air_quality, *coords)
+                    futures[aqi_future] = 'air_quality'
+                    pending.add(aqi_future)
+        
+        log_search_history(city, success=bundle['weather'] is not None)
+        
+        if bundle['weather'] is None:
+            raise WeatherAPIError(bundle['errors']['weather'])
+        self._record_search(bundle['weather'])
+        
+        bundle['_metadata'] = {
+            'city_searched': city,
+            'units': units,
+            'fetch_time': time.time(),
+            'response_time': time.time() - start_time
+        }
+        
+        logger.info(f"Fetched bundle for {city} in {bundle['_metadata']['response_time']:.2f}s")
+        return bundle
+    
+    def get_weather_for_cities(self, cities: List[str], units: str = "metric") -> List[Dict[str, Any]]:
+        """
+        Get current weather for several cities in parallel
+        
+        Returns:
+            Weather payloads in the same order as cities
+            
+        Raises:
+            WeatherAPIError: If any city fails
+        """
+        futures = [self._submit(self._fetch_weather, city, units) for city in cities]
+        results = []
+        
+        for city, future in zip(cities, futures):
+            try:
+                results.append(future.result())
+                self._record_search(results[-1])
+                log_search_history(city, success=True)
+            except WeatherAPIError:
+                log_search_history(city, success=False)
+                raise
+        
+        return results
+    
+    def iter_multiple_cities_weather(self, cities: List[str], units: str = "metric",
+                                     request_priority: str = "batch", log_search: bool = True
+                                     ) -> Iterator[Tuple[str, Union[Dict[str, Any], Exception]]]:
+        """
+        Fetch weather for several cities concurrently, yielding each as it completes
+        
+        Fetches are queued in request_priority, so they wait behind
+        interactive requests. Closing the generator early cancels the
+        fetches that have not started. log_search adds each city to the
+        Streamlit session history.
+        
+        Yields:
+            (city, payload) on success or (city, exception) on failure, in
+            completion order
+        """
+        with priority(request_priority):
+            futures = {self._submit(self._fetch_weather, city, units): city for city in dict.fromkeys(cities)}
+        
+        try:
+            for future in as_completed(futures):
+                city = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to get weather for {city}: {e}")
+                    if log_search:
+                        log_search_history(city, success=False)
+                    yield city, e
+                else:
+                    self._record_search(data)
+                    if log_search:
+                        log_search_history(city, success=True)
+                    yield city, data
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    def get_multiple_cities_weather(self, cities: List[str], units: str = "metric",
+                                    request_priority: str = "batch", log_search: bool = True) -> Dict[str, Any]:
+        """Get weather data for multiple cities (queued behind interactive requests; duplicates fetched once)"""
+        outcomes = dict(self.iter_multiple_cities_weather(cities, units, request_priority, log_search))
+        ordered = [(city, outcomes[city]) for city in dict.fromkeys(cities)]
+        results = {city: outcome for city, outcome in ordered if not isinstance(outcome, Exception)}
+        errors = {city: str(outcome) for city, outcome in ordered if isinstance(outcome, Exception)}
+        
+        return {
+            'successful': results,
+            'errors': errors,
+            'total_requested': len(ordered),
+            'successful_count': len(results),
+            'error_count': len(errors)
+        }
+
+def _payload_coordinates(part: str, data: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Extract (lat, lon) from a weather or forecast payload"""
+    try:
+        coord = data['city']['coord'] if part == 'forecast' else data['coord']
+        return coord['lat'], coord['lon']
+    except (KeyError, TypeError):
+        return None
+
+# Convenience functions for backward compatibility
+_default_api: Optional[WeatherAPI] = None
+_default_api_lock = threading.Lock()
+
+def _shared_api() -> WeatherAPI:
+    """The module's WeatherAPI, created on first use so every call shares its caches and connections"""
+    global _default_api
+    with _default_api_lock:
+        if _default_api is None:
+            _default_api = WeatherAPI()
+        return _default_api
+
+def get_weather(city: str, units: str = "metric") -> Dict[str, Any]:
+    """Convenience function to get current weather"""
+    return _shared_api().get_weather(city, units)
+
+def get_forecast(city: str, days: int = 3, units: str = "metric") -> Dict[str, Any]:
+    """Convenience function to get weather forecast"""
+    return _shared_api().get_forecast(city, days, units)